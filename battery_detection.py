@@ -10,12 +10,20 @@ Uses raw socket Modbus with retries for reliability.
 
 import logging
 import socket
+import threading
 import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import List, Dict, Optional
+from typing import Deque, List, Dict, Optional, Tuple
 
+try:
+    import crcmod.predefined  # Optional C-backed CRC implementation
+except ImportError:
+    crcmod = None
 
-@dataclass
+
+@dataclass(slots=True)
 class DetectedBattery:
     """Represents a detected battery on a Modbus interface."""
     interface_port: int          # Modbus TCP port (10001-10008)
@@ -33,7 +41,7 @@ class DetectedBattery:
         return f"Battery(port={self.interface_port}, id={self.slave_id}, idx={self.battery_index})"
 
 
-@dataclass
+@dataclass(slots=True)
 class ModbusInterface:
     """Represents a Modbus interface configuration."""
     host: str
@@ -46,19 +54,54 @@ class ModbusInterface:
         return self.port - 10001
 
 
-def modbus_crc(data):
-    """Calculate Modbus CRC-16 checksum."""
+class _InterfaceDown(Exception):
+    """Raised when an interface port cannot be connected to at all."""
+
+
+def _build_crc16_nibble_table():
+    """Build the 16-entry (half-byte) CRC-16/Modbus table (polynomial 0xA001)."""
+    table = []
+    for i in range(16):
+        crc = i
+        for _ in range(4):
+            # -(crc & 1) is an all-ones mask when the LSB is set, else 0.
+            crc = (crc >> 1) ^ (0xA001 & -(crc & 1))
+        table.append(crc)
+    return tuple(table)
+
+
+def _build_crc16_table():
+    """Build the 256-entry byte table from two nibble steps per entry."""
+    table = []
+    for i in range(256):
+        crc = (i >> 4) ^ _CRC16_NIBBLE[i & 0xF]
+        crc = (crc >> 4) ^ _CRC16_NIBBLE[crc & 0xF]
+        table.append(crc)
+    return tuple(table)
+
+
+_CRC16_NIBBLE = _build_crc16_nibble_table()
+_CRC16_TABLE = _build_crc16_table()
+
+
+def _modbus_crc_py(data):
+    """Calculate Modbus CRC-16 checksum (table-driven, one lookup per byte)."""
     crc = 0xFFFF
     for byte in data:
-        crc ^= byte
-        for _ in range(8):
-            if crc & 0x0001:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                crc >>= 1
+        crc = (crc >> 8) ^ _CRC16_TABLE[(crc ^ byte) & 0xFF]
     return crc.to_bytes(2, 'little')
 
 
+if crcmod is not None:
+    _crc16_native = crcmod.predefined.mkCrcFun('modbus')
+
+    def modbus_crc(data):
+        """Calculate Modbus CRC-16 checksum using crcmod's C backend."""
+        return _crc16_native(bytes(data)).to_bytes(2, 'little')
+else:
+    modbus_crc = _modbus_crc_py
+
+
 class BatteryDetector:
     """
     Scans Modbus interfaces to detect connected batteries.
@@ -73,6 +116,9 @@ class BatteryDetector:
     MAX_BATTERIES_PER_INTERFACE = 32
     MAX_TOTAL_BATTERIES = 256
     BASE_PORT = 10001
+    POOL_MAX_PER_PORT = 3         # Idle sockets kept per interface port
+    POOL_IDLE_TIMEOUT = 30.0      # Seconds before an idle pooled socket is closed
+    RECV_BUFFER_SIZE = 260        # Largest RTU reply: 3 header + 255 data + 2 CRC
     
     def __init__(self, host: str, interface_ports: List[int], 
                  sensors_per_battery: int = 24,
@@ -80,7 +126,8 @@ class BatteryDetector:
                  test_register: int = 0,
                  test_register_count: int = 1,
                  max_batteries_per_interface: int = 32,
-                 retries: int = 3):
+                 retries: int = 3,
+                 scan_concurrency: int = 1):
         """
         Initialize the battery detector.
         
@@ -93,6 +140,9 @@ class BatteryDetector:
             test_register_count: Number of registers to read for test
             max_batteries_per_interface: Max slave IDs to scan per interface (1-32)
             retries: Number of retries for reliability
+            scan_concurrency: Max slave IDs probed at once per interface.
+                Default 1: each port is one half-duplex RS485 line, so its
+                slaves are probed one at a time (interfaces still run in parallel)
         """
         self.host = host
         self.interface_ports = sorted(set(interface_ports))
@@ -100,8 +150,18 @@ class BatteryDetector:
         self.scan_timeout = scan_timeout
         self.test_register = test_register
         self.test_register_count = test_register_count
+        # Register address + count are fixed for the detector's lifetime.
+        self._test_reg_bytes = test_register.to_bytes(2, 'big') + test_register_count.to_bytes(2, 'big')
         self.max_batteries_per_interface = min(max_batteries_per_interface, self.MAX_BATTERIES_PER_INTERFACE)
         self.retries = retries
+        self.scan_concurrency = max(1, min(scan_concurrency, self.max_batteries_per_interface))
+        
+        # Only the slave ID varies between probes, so precompute every query
+        # (CRC included) and the slave/function/byte-count header a good reply starts with.
+        slave_ids = range(1, self.max_batteries_per_interface + 1)
+        self._query_by_sid: Dict[int, bytes] = {sid: self._build_query(sid) for sid in slave_ids}
+        self._reply_header_by_sid: Dict[int, bytes] = {sid: self._build_reply_header(sid) for sid in slave_ids}
+        self._reply_len = 3 + 2 * test_register_count + 2
         
         # Validate ports
         for port in self.interface_ports:
@@ -109,66 +169,155 @@ class BatteryDetector:
                 raise ValueError(f"Invalid interface port {port}. Must be {self.BASE_PORT}-{self.BASE_PORT + self.MAX_INTERFACES - 1}")
         
         self.detected_batteries: List[DetectedBattery] = []
+        self._by_index: Dict[int, DetectedBattery] = {}
+        self._by_port: Dict[int, List[DetectedBattery]] = defaultdict(list)
+        self._total_sensors = 0
         self.interfaces: Dict[int, ModbusInterface] = {}
         
         for port in self.interface_ports:
             self.interfaces[port] = ModbusInterface(host=host, port=port)
+        
+        # Idle connections reused by refresh_battery_status, LIFO per port.
+        self._pool: Dict[int, Deque[Tuple[socket.socket, float]]] = defaultdict(deque)
+        self._pool_lock = threading.Lock()
+        # Per-thread receive buffer, reused across probes (probes run in pools).
+        self._local = threading.local()
+    
+    def _recv_buffer(self) -> bytearray:
+        """Return this thread's reusable receive buffer."""
+        buf = getattr(self._local, 'recv_buf', None)
+        if buf is None:
+            buf = self._local.recv_buf = bytearray(self.RECV_BUFFER_SIZE)
+        return buf
+    
+    def _build_query(self, slave_id: int) -> bytes:
+        """Build the read-holding-registers detection query for a slave ID."""
+        query_base = bytes((slave_id, 3)) + self._test_reg_bytes
+        return query_base + modbus_crc(query_base)
+    
+    def _build_reply_header(self, slave_id: int) -> bytes:
+        """Build the header a successful detection reply must start with."""
+        return bytes((slave_id, 3, (2 * self.test_register_count) & 0xFF))
+    
+    def _open_socket(self, port: int) -> socket.socket:
+        """Open a new TCP connection to the given interface port."""
+        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        sock.settimeout(self.scan_timeout)
+        # One small query per round trip: don't let Nagle hold it back.
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Pooled sockets can sit idle; let the kernel notice dead peers.
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+        try:
+            sock.connect((self.host, port))
+        except socket.error:
+            sock.close()
+            raise
+        return sock
     
-    def _test_battery_connection(self, port: int, slave_id: int) -> bool:
+    def _acquire(self, port: int) -> socket.socket:
+        """Take the most recently used idle socket for a port, or open a new one."""
+        now = time.monotonic()
+        with self._pool_lock:
+            idle = self._pool[port]
+            # Oldest entries sit on the left; drop any past the idle timeout.
+            while idle and now - idle[0][1] > self.POOL_IDLE_TIMEOUT:
+                idle.popleft()[0].close()
+            if idle:
+                return idle.pop()[0]
+        return self._open_socket(port)
+    
+    def _release(self, port: int, sock: socket.socket, healthy: bool) -> None:
+        """Return a socket to the pool, or close it if it errored or the pool is full."""
+        if healthy:
+            with self._pool_lock:
+                idle = self._pool[port]
+                if len(idle) < self.POOL_MAX_PER_PORT:
+                    idle.append((sock, time.monotonic()))
+                    return
+        sock.close()
+    
+    def close_pool(self) -> None:
+        """Close all pooled connections."""
+        with self._pool_lock:
+            for idle in self._pool.values():
+                while idle:
+                    idle.pop()[0].close()
+    
+    def _test_battery_connection(self, port: int, slave_id: int, use_pool: bool = False) -> bool:
         """
         Test if a battery responds at the given port and slave ID.
-        Uses retries for reliability.
+        Uses retries for reliability. With use_pool, the connection is taken
+        from and returned to the per-port pool instead of opened per attempt.
+        
+        Raises:
+            _InterfaceDown: If a connect fails and the redial after it also
+                fails (a single refusal may just be a busy gateway).
         """
+        query = self._query_by_sid.get(slave_id) or self._build_query(slave_id)
+        reply_header = self._reply_header_by_sid.get(slave_id) or self._build_reply_header(slave_id)
+        
+        connect_failed = False
         for attempt in range(self.retries):
             try:
-                sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                sock.settimeout(self.scan_timeout)
-                
                 try:
-                    sock.connect((self.host, port))
+                    sock = self._acquire(port) if use_pool else self._open_socket(port)
                 except socket.error as e:
                     logging.debug(f"Cannot connect to {self.host}:{port}: {e}")
+                    if connect_failed:
+                        raise _InterfaceDown(f"{self.host}:{port}: {e}") from e
+                    connect_failed = True
                     continue
+                # Connected: only back-to-back connect failures mean the port is down.
+                connect_failed = False
                 
+                healthy = False
                 try:
-                    # Build Modbus query
-                    query_base = bytes([slave_id, 3]) + \
-                                self.test_register.to_bytes(2, 'big') + \
-                                self.test_register_count.to_bytes(2, 'big')
-                    query = query_base + modbus_crc(query_base)
-                    
                     sock.sendall(query)
-                    time.sleep(0.3)  # Wait for response
                     
+                    # Read until the full frame is in rather than sleeping a
+                    # fixed interval; the socket timeout bounds the wait.
+                    buf = self._recv_buffer()
+                    view = memoryview(buf)
+                    received = 0
+                    expected_len = 5
                     try:
-                        response = sock.recv(256)
+                        while received < expected_len:
+                            n = sock.recv_into(view[received:])
+                            if not n:
+                                break
+                            received += n
+                            if received >= 3 and not buf[1] & 0x80:
+                                expected_len = buf[2] + 5
                     except socket.timeout:
                         continue
                     
-                    if not response or len(response) < 5:
-                        continue
-                    
-                    # Verify response
-                    if response[0] != slave_id:
+                    if received < 5:
                         continue
+                    response = view[:received]
                     
-                    if response[1] & 0x80:  # Error response
+                    # Cheap checks first: slave ID, function code (exception
+                    # replies set bit 0x80) and byte count must all match
+                    # before the CRC is worth computing.
+                    if response[:3] != reply_header or received < self._reply_len:
                         continue
                     
                     # Verify CRC
-                    data_len = response[2] + 3
-                    if len(response) >= data_len + 2:
-                        received_crc = response[data_len:data_len+2]
-                        calculated_crc = modbus_crc(response[:data_len])
-                        if received_crc != calculated_crc:
-                            continue
+                    data_len = self._reply_len - 2
+                    if response[data_len:self._reply_len] != modbus_crc(response[:data_len]):
+                        continue
                     
                     logging.info(f"Battery detected: port={port}, slave_id={slave_id}")
+                    healthy = True
                     return True
                     
                 finally:
-                    sock.close()
+                    if use_pool:
+                        self._release(port, sock, healthy)
+                    else:
+                        sock.close()
                     
+            except _InterfaceDown:
+                raise
             except Exception as e:
                 logging.debug(f"Error testing battery at {self.host}:{port} slave {slave_id}: {e}")
             
@@ -182,10 +331,33 @@ class BatteryDetector:
         
         logging.info(f"Scanning interface on port {port} for slave IDs 1-{self.max_batteries_per_interface}...")
         
-        for slave_id in range(1, self.max_batteries_per_interface + 1):
-            if self._test_battery_connection(port, slave_id):
-                detected_slaves.append(slave_id)
-                logging.info(f"  Found battery at slave ID {slave_id}")
+        slave_ids = list(range(1, self.max_batteries_per_interface + 1))
+        if self.scan_concurrency > 1:
+            with ThreadPoolExecutor(max_workers=self.scan_concurrency) as executor:
+                results = executor.map(lambda sid: self._test_battery_connection(port, sid), slave_ids)
+                done = 0
+                try:
+                    for found in results:
+                        if found:
+                            detected_slaves.append(slave_ids[done])
+                            logging.info(f"  Found battery at slave ID {slave_ids[done]}")
+                        done += 1
+                except _InterfaceDown:
+                    # A gateway that takes one connection per port refuses the
+                    # parallel dials; let the in-flight probes finish, then
+                    # re-check the rest serially before calling the port down.
+                    executor.shutdown(wait=True, cancel_futures=True)
+            slave_ids = slave_ids[done:]
+        
+        try:
+            for slave_id in slave_ids:
+                if self._test_battery_connection(port, slave_id):
+                    detected_slaves.append(slave_id)
+                    logging.info(f"  Found battery at slave ID {slave_id}")
+        except _InterfaceDown as e:
+            # Nothing else is in flight here, so every remaining slave ID
+            # would fail the same way.
+            logging.warning(f"Interface port {port} not listening, skipping: {e}")
         
         if port in self.interfaces:
             self.interfaces[port].detected_batteries = detected_slaves
@@ -195,13 +367,19 @@ class BatteryDetector:
     def scan_all_interfaces(self) -> List[DetectedBattery]:
         """Scan all configured interfaces for batteries."""
         self.detected_batteries.clear()
+        self._by_index.clear()
+        self._by_port.clear()
+        self._total_sensors = 0
         battery_index = 0
         
         logging.info(f"Starting battery detection scan on {len(self.interface_ports)} interface(s)...")
         
-        for port in self.interface_ports:
-            detected_slaves = self.scan_interface(port)
-            
+        # Interfaces are independent, so scan them concurrently; batteries are
+        # numbered afterwards in port order so indices stay stable.
+        with ThreadPoolExecutor(max_workers=max(1, len(self.interface_ports))) as executor:
+            results = list(executor.map(self.scan_interface, self.interface_ports))
+        
+        for port, detected_slaves in zip(self.interface_ports, results):
             for slave_id in detected_slaves:
                 if battery_index >= self.MAX_TOTAL_BATTERIES:
                     logging.warning(f"Maximum battery limit ({self.MAX_TOTAL_BATTERIES}) reached!")
@@ -214,6 +392,9 @@ class BatteryDetector:
                     sensors_per_battery=self.sensors_per_battery
                 )
                 self.detected_batteries.append(battery)
+                self._by_index[battery_index] = battery
+                self._by_port[port].append(battery)
+                self._total_sensors += battery.sensors_per_battery
                 battery_index += 1
             
             if battery_index >= self.MAX_TOTAL_BATTERIES:
@@ -227,26 +408,40 @@ class BatteryDetector:
     
     def get_battery_by_index(self, index: int) -> Optional[DetectedBattery]:
         """Get a battery by its global index."""
-        for bat in self.detected_batteries:
-            if bat.battery_index == index:
-                return bat
-        return None
+        return self._by_index.get(index)
     
     def get_batteries_on_interface(self, port: int) -> List[DetectedBattery]:
         """Get all batteries on a specific interface."""
-        return [bat for bat in self.detected_batteries if bat.interface_port == port]
+        return list(self._by_port.get(port, ()))
     
     def get_total_sensor_count(self) -> int:
         """Get total number of temperature sensors across all batteries."""
-        return sum(bat.sensors_per_battery for bat in self.detected_batteries)
+        return self._total_sensors
+    
+    def _probe_batteries(self, batteries: List[DetectedBattery]) -> List[bool]:
+        """Probe batteries sharing one interface one at a time through its pooled socket."""
+        online = []
+        try:
+            for bat in batteries:
+                online.append(self._test_battery_connection(bat.interface_port, bat.slave_id, use_pool=True))
+        except _InterfaceDown as e:
+            logging.warning(f"Interface port {batteries[0].interface_port} not listening: {e}")
+        # Anything not probed (interface down) counts as offline.
+        online.extend([False] * (len(batteries) - len(online)))
+        return online
     
     def refresh_battery_status(self) -> None:
         """Re-check all detected batteries to update online status."""
-        for battery in self.detected_batteries:
-            is_online = self._test_battery_connection(battery.interface_port, battery.slave_id)
-            battery.is_online = is_online
-            if is_online:
-                battery.last_seen = time.time()
+        # Interfaces in parallel; each port's RS485 line is probed serially.
+        with ThreadPoolExecutor(max_workers=max(1, len(self._by_port))) as executor:
+            results = list(executor.map(self._probe_batteries, self._by_port.values()))
+        
+        now = time.time()
+        for batteries, online in zip(self._by_port.values(), results):
+            for battery, is_online in zip(batteries, online):
+                battery.is_online = is_online
+                if is_online:
+                    battery.last_seen = now
     
     def get_detection_summary(self) -> Dict:
         """Get a summary of detected batteries for logging/display."""
@@ -257,7 +452,7 @@ class BatteryDetector:
         }
         
         for port in self.interface_ports:
-            batteries = self.get_batteries_on_interface(port)
+            batteries = self._by_port.get(port, ())
             summary['interfaces'][port] = {
                 'battery_count': len(batteries),
                 'slave_ids': [b.slave_id for b in batteries],
@@ -294,6 +489,7 @@ def create_detector_from_config(settings: dict) -> BatteryDetector:
     sensors_per_battery = num_series_banks * sensors_per_bank
     timeout = float(settings.get('detection_timeout', 2.0))
     max_per_interface = int(settings.get('max_batteries_per_interface', 32))
+    scan_concurrency = int(settings.get('scan_concurrency', 1))
     
     return BatteryDetector(
         host=host,
@@ -301,7 +497,8 @@ def create_detector_from_config(settings: dict) -> BatteryDetector:
         sensors_per_battery=sensors_per_battery,
         scan_timeout=timeout,
         max_batteries_per_interface=max_per_interface,
-        retries=3
+        retries=3,
+        scan_concurrency=scan_concurrency
     )
 
 
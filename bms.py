@@ -1,13 +1,9 @@
 #!/usr/bin/env python3
 
 
-def get_port_for_slave(slave_addr, slave_addresses, slave_ports, default_port):
-    """Get the Modbus port for a given slave address."""
-    try:
-        idx = slave_addresses.index(slave_addr)
-        return slave_ports[idx] if idx < len(slave_ports) else default_port
-    except ValueError:
-        return default_port
+def get_port_for_slave(slave_addr, slave_port_map, default_port):
+    """Get the Modbus port for a given slave address (slave_port_map is built once in load_config)."""
+    return slave_port_map.get(slave_addr, default_port)
 # --------------------------------------------------------------------------------
 # Battery Management System (BMS) Script Documentation
 # --------------------------------------------------------------------------------
@@ -196,8 +192,10 @@ v |
 # - **Python Version:** 3.11 or higher (core language for running the code).
 # - **Hardware Libraries:** smbus (for I2C communication with sensors/relays), RPi.GPIO (for controlling Raspberry Pi pins). Install: sudo apt install python3-smbus python3-rpi.gpio.
 # - **External Library:** art (for ASCII art in TUI). Install: pip install art.
-# - **Time-Series Storage:** rrdtool (for RRD database). Install: sudo apt install rrdtool.
-# - **Standard Python Libraries:** socket (networking), statistics (math like medians), time (timing/delays), configparser (read INI), logging (save logs), signal (handle shutdown), gc (memory cleanup), os (files), sys (exit), argparse (command-line), threading (web server and watchdog), json/http.server/urllib/base64 (web), traceback (errors), fcntl/struct (watchdog), subprocess (for rrdtool commands), xml.etree.ElementTree (for parsing RRD XML output).
+# - **Web Libraries:** flask (dashboard/API). Optional: waitress (faster multi-threaded web server; Flask's built-in server is used without it), orjson (faster JSON for API replies). Install: sudo apt install python3-flask python3-waitress; pip install orjson.
+# - **Optional:** numpy (checks all temperature channels at once instead of one by one; script falls back to plain Python without it). Install: sudo apt install python3-numpy.
+# - **Time-Series Storage:** rrdtool (for RRD database). Install: sudo apt install rrdtool. Optional: python3-rrdtool (native Python binding, avoids starting an rrdtool process per update/fetch). Install: sudo apt install python3-rrdtool.
+# - **Standard Python Libraries:** socket (networking), statistics (math like medians), time (timing/delays), configparser (read INI), logging (save logs), signal (handle shutdown), gc (memory cleanup), os (files), sys (exit), argparse (command-line), threading (web server and watchdog), json (web), traceback (errors), fcntl/struct (watchdog), subprocess (for rrdtool commands).
 # - **Hardware Requirements:** Raspberry Pi (any model, detects for watchdog), ADS1115 ADC (voltage), TCA9548A multiplexer (I2C channels), Relays (balancing), Lantronix EDS4100 (Modbus for temps), GPIO pins (e.g., 5 for DC-DC, 6 for alarm, 4 for fan).
 # - **No Internet for Installs:** All libraries must be pre-installed; script can't download. For web charts, Chart.js is loaded via CDN (requires internet for dashboard users).
 # **Installation Guide (Step-by-Step for Non-Programmers):**
@@ -231,7 +229,10 @@ v |
 # Import statements: These bring in tools and libraries that the script needs to work.
 # Think of them as gathering the ingredients and tools before cooking.
 import socket # Network communication tool - like a phone to call the temperature sensor device over the internet.
+import select # Network waiter - waits for a connection to finish opening without blocking forever.
+import errno # Network error codes - tells "connection still opening" apart from real failures.
 import statistics # Math helper for calculating averages and middle values of temperature readings.
+import warnings # Warning filter - silences NumPy's "empty bank" warning when a whole bank is disconnected.
 import time # Time management - handles delays, waits, and records when things happen (like a clock).
 import configparser # Settings reader - loads configuration from the INI file, like reading a recipe book.
 import logging # Event recorder - writes messages about what's happening to a log file for later review.
@@ -241,17 +242,28 @@ import os # File system manager - handles reading/writing files, like saving cal
 import sys # System controller - manages program exit and command-line arguments.
 import argparse # Command-line argument parser - handles options like --validate-config.
 import threading # Multi-tasking tool - runs the web server separately from the main program.
+import queue # Hand-off line between threads - passes alert emails to the background sender.
+from collections import deque # Fixed-size list - keeps only the newest events, dropping the oldest automatically.
+from itertools import islice # Reads part of a sequence without copying it - used for the newest events in the TUI.
+from functools import lru_cache # Result memory - remembers already-built ASCII art so the TUI doesn't rebuild it every refresh.
+from concurrent.futures import ThreadPoolExecutor # Worker pool - reads several Modbus ports at the same time.
 import json # Data formatter - converts data to/from a format that web browsers understand.
-from urllib.parse import urlparse, parse_qs # Web request parser - breaks down web addresses and data.
-import base64 # Secret code decoder - handles user login credentials for the web interface.
 import traceback # Error detail recorder - captures full error information for debugging.
 import subprocess # External program runner - executes other tools like the database updater.
-import xml.etree.ElementTree as ET # XML data reader - parses database output files.
 try:
     from flask import Flask, jsonify, request, make_response # Web server framework for reliable API handling.
+    from werkzeug.serving import make_server # Flask's built-in server, used when waitress isn't installed.
 except ImportError:
     print("Flask not available - web interface disabled") # Warn user if Flask library is missing.
     Flask = None # Set to none if missing, so web features are skipped.
+try:
+    import orjson # Fast JSON encoder (C/Rust) - builds the big status/history API replies much quicker than json.
+except ImportError:
+    orjson = None # Fall back to Flask's jsonify (standard json module).
+try:
+    import waitress # Production web server - thread pool and keep-alive connections for the dashboard/API.
+except ImportError:
+    waitress = None # Fall back to Flask's built-in server.
 try:
     import smbus # Communicates with I2C devices like the ADC and relays - hardware talker.
     import RPi.GPIO as GPIO # Controls Raspberry Pi GPIO pins for relays - pin controller.
@@ -267,10 +279,23 @@ try:
     import fcntl # For watchdog ioctl - low-level control.
 except ImportError:
     fcntl = None
+try:
+    import numpy as np # Fast array math - checks all temperature channels in one go instead of one at a time.
+except ImportError:
+    np = None # Fall back to plain Python loops.
+try:
+    import rrdtool # Native RRD database binding - create/info/updates/fetches in-process instead of running the rrdtool command.
+    RRD_ERRORS = (subprocess.CalledProcessError, rrdtool.OperationalError) # Failures from either RRD path.
+except ImportError:
+    rrdtool = None # Fall back to running the rrdtool command-line program.
+    RRD_ERRORS = (subprocess.CalledProcessError,)
 import struct # For watchdog struct - data packer.
-config_parser = configparser.ConfigParser(comment_prefixes=(';', '#')) # Object to read INI file - config reader, handles ; and # comments.
+from dataclasses import dataclass # Fixed record builder - holds the main loop's settings as plain attributes.
+config_parser = configparser.ConfigParser(comment_prefixes=(';', '#'), interpolation=None, empty_lines_in_values=False) # Object to read INI file - config reader, handles ; and # comments; values are taken literally (a % in a password is just a %).
 bus = None # I2C bus for communicating with hardware - hardware connection.
-last_email_time = 0 # Tracks when the last email alert was sent - email timer.
+last_email_time = None # time.monotonic() when the last email alert was queued, None = none yet - email timer.
+email_queue = queue.Queue(maxsize=8) # (message, text) alert emails waiting for the background sender thread - outbox (bounded, so a dead mail server can't pile them up).
+email_thread = None # Background thread that sends queued emails - started on first alert.
 balance_start_time = None # Tracks when balancing started - balance clock start.
 last_balance_time = 0 # Tracks when the last balancing ended - balance clock end.
 battery_voltages = [] # Stores current voltages for each bank - voltage list.
@@ -280,13 +305,18 @@ run_count = 0 # Counts how many times the main loop has run - cycle counter.
 startup_offsets = None # Temperature calibration offsets from startup - adjustment numbers.
 startup_median = None # Median temperature at startup - average at start.
 startup_set = False # Indicates if temperature calibration is set - calibration flag.
-alert_states = {} # Tracks alerts for each temperature channel - alert memory.
 balancing_active = False # Indicates if balancing is currently happening - balancing flag.
 startup_failed = False # Indicates if startup tests failed - test fail flag.
 startup_alerts = [] # Stores startup test failure messages - test error list.
 balancer_failed = False # New: Indicates if balancer hardware failed verification - prevents future balancing.
 web_server = None # Web server object - web host.
-event_log = [] # Stores the last N events (configurable) - event history.
+alarm_relay_on = None # Last state written to the alarm relay (None = not written yet) - skips repeat writes.
+tui_last_size = None # Terminal size at the last TUI draw - a change forces a full repaint.
+local_ip_cache = None # (expires at, ip) - this Pi's address for the TUI's web URL line, see get_local_ip().
+LOCAL_IP_CACHE_SECONDS = 60 # How long the looked-up local IP address is reused.
+poll_time_str = '' # Timestamp of the current poll, formatted once per loop for all of that poll's event log entries.
+event_time_cache = (None, '') # (whole second, formatted text) of the last event log timestamp - reused within the same second.
+event_log = deque(maxlen=20) # Stores the last N events (configurable, resized in main()) - oldest drop off automatically - event history.
 web_data = {
     'voltages': [], # Will be filled dynamically based on num_series_banks
     'temperatures': [], # Will be filled dynamically based on total_channels
@@ -296,14 +326,100 @@ web_data = {
     'last_update': time.time(), # Last data update timestamp - update time.
     'system_status': 'Initializing' # System status (e.g., Running, Alert) - status string.
 }
-BANK_SENSOR_INDICES = [] # Will be filled dynamically based on num_series_banks
+BANK_SENSOR_INDICES = () # Will be filled dynamically based on num_series_banks (tuple of per-bank index tuples)
+CHANNEL_TO_BANK = [] # Flat channel -> bank lookup (index 0 unused, 0 means no bank), built from BANK_SENSOR_INDICES in main()
+CHANNEL_TO_BATTERY_LOCAL = [] # Flat channel -> (battery_id, local_ch) lookup (index 0 unused), built in main()
+CHANNEL_ALERT_PREFIX = [] # Flat channel -> 'Battery X Bank Y Local Ch Z' alert label (index 0 unused), built in main()
+BANK_INDEX_ARRAY = None # NumPy version of BANK_SENSOR_INDICES (banks x sensors), built in main() when NumPy is installed
+CHANNEL_BANK_ARRAY = None # NumPy 0-based bank number for each 0-based channel, built in main() when NumPy is installed
 NUM_BANKS = 3 # Will be overridden by config in main()
+SENSORS_PER_BATTERY = 24 # Sensors per parallel battery (num_series_banks * sensors_per_bank) - overridden by config in main()
 WATCHDOG_DEV = '/dev/watchdog' # Device file for watchdog - hardware reset preventer.
-watchdog_fd = None # File handle for watchdog - open connection.
-alive_timestamp = 0.0 # Shared timestamp updated by main to indicate aliveness - for watchdog thread.
+watchdog_fd = None # OS file descriptor (int) for the watchdog device - open connection.
+WDIOC_SETTIMEOUT = 0xC0045706 # Linux watchdog ioctl: set timeout (_IOWR('W', 6, int)), from linux/watchdog.h.
+alive_timestamp = 0.0 # Shared time.monotonic() timestamp updated by main to indicate aliveness - for watchdog thread.
+alive_event = threading.Event() # Set by main at the end of each poll cycle to wake the watchdog thread right away - "I'm alive" doorbell.
 RRD_FILE = 'bms.rrd' # RRD database file for storing time-series data - persistent storage.
+RRD_BATCH_SIZE = 1 # Samples to collect before writing them to the RRD in one update - overridden by config in main().
+RRD_DAEMON = '' # rrdcached address (e.g. unix:/var/run/rrdcached.sock); empty = write the RRD file directly - overridden by config in main().
+rrd_pipe = None # Long-running "rrdtool -" process fed commands over a pipe, used when the native binding isn't installed.
+rrd_pipe_lock = threading.Lock() # One command at a time on that pipe (main loop and setup share it).
+rrd_pending_updates = [] # Samples waiting for the next batched RRD write - update queue.
+RRD_HISTORY_CACHE_SECONDS = 60 # How long a history fetch is reused - matches the RRD's 60s step, so newer fetches would return the same rows.
+rrd_history_cache = {'time': 0.0, 'data': None} # Last history fetch and when it was taken - chart cache.
+rrd_history_lock = threading.Lock() # Lock so concurrent web requests share one fetch instead of each running their own.
+BALANCE_FRAME_SECONDS = 0.25 # Time between balancing progress redraws (spinner frames) - 4 a second.
+GC_COLLECT_INTERVAL = 600 # Seconds between full memory clean-ups in the main loop (was every poll).
+MUX_CHANNEL_MASKS = tuple(1 << c for c in range(8)) # I2C multiplexer select byte for channels 0-7 (channel 0 = 0x01, 1 = 0x02, ...).
+VOLTAGE_FAIL_LIMIT = 3 # Failed voltage reads in a row before a bank is rested instead of re-read every time.
+VOLTAGE_FAIL_SKIP = 5 # How many reads of a rested bank are skipped (answered "no reading") before trying it again.
+voltage_fail_count = {} # bank_id -> failed voltage reads in a row.
+voltage_skip_left = {} # bank_id -> reads still to skip for a rested bank.
+GC_THRESHOLDS = (50000, 20, 20) # Automatic clean-up triggers - far fewer young-object sweeps than Python's default (700, 10, 10).
 HISTORY_LIMIT = 1440 # Number of historical entries to retain (e.g., ~24 hours at 1min steps) - limit for memory/efficiency.
-data_lock = threading.Lock() # Lock for thread-safe access to web_data
+modbus_sockets = {} # Open Modbus TCP connections kept between polls, keyed by (ip, port) - reused phone lines.
+MODBUS_PROBE_CACHE_SECONDS = 2.0 # How long a connectivity probe result is reused for the same port.
+modbus_probe_cache = {} # Last connectivity probe per (ip, port): (monotonic time, reachable) - saves re-dialling during outages.
+modbus_last_exchange = {} # When the last reply finished on each (ip, port), monotonic seconds - for the RS485 turn-around gap.
+MODBUS_CONNECT_TIMEOUT = 2.0 # Seconds to wait for a Modbus TCP connection to open.
+MODBUS_RECV_TIMEOUT = 5 # Seconds to wait for the first reply bytes (slow 9600 baud devices).
+MODBUS_MAX_READ_REGISTERS = 125 # Modbus limit on registers per "read holding registers" request.
+MODBUS_RCVBUF = 65536 # Kernel receive buffer for Modbus sockets - room for whole multi-register replies.
+modbus_poll_pool = None # Worker threads for reading Modbus ports in parallel - created in main().
+
+@dataclass(frozen=True, slots=True)
+class LoopConfig:
+    """
+    The settings the main loop reads on every poll, copied out of the settings dictionary once at startup.
+    Reading an attribute of this frozen (read-only) record is a single step, and it can't be changed by accident mid-run.
+    Non-programmer: Like copying the few numbers you need onto a sticky note instead of flipping through the manual each time.
+    """
+    valid_min: float # Below this = invalid/disconnected sensor (°C).
+    high_threshold: float # Too hot above this (°C).
+    low_threshold: float # Too cold below this (°C).
+    abs_deviation_threshold: float # Max absolute difference from bank median (°C).
+    deviation_threshold: float # Max relative difference from bank median (fraction).
+    rise_threshold: float # Max rise per poll (°C).
+    disconnection_lag_threshold: float # Max lag from bank median change (°C).
+    poll_interval: float # Seconds between polls.
+    cabinet_over_temp_threshold: float # Fan on above this median (°C).
+    fan_relay_pin: int # GPIO pin for the cabinet fan.
+    voltage_difference_to_balance: float # Balance when banks differ by more than this (V).
+    balance_rest_period_seconds: int # Cooldown after a balance (s).
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Build the record from the settings dictionary returned by load_config."""
+        return cls(
+            valid_min=settings['valid_min'],
+            high_threshold=settings['high_threshold'],
+            low_threshold=settings['low_threshold'],
+            abs_deviation_threshold=settings['abs_deviation_threshold'],
+            deviation_threshold=settings['deviation_threshold'],
+            rise_threshold=settings['rise_threshold'],
+            disconnection_lag_threshold=settings['disconnection_lag_threshold'],
+            poll_interval=settings['poll_interval'],
+            cabinet_over_temp_threshold=settings['cabinet_over_temp_threshold'],
+            fan_relay_pin=settings['FanRelayPin'],
+            voltage_difference_to_balance=settings['VoltageDifferenceToBalance'],
+            balance_rest_period_seconds=settings['BalanceRestPeriodSeconds'],
+        )
+
+def publish_web_data(**changes):
+    """
+    Replace web_data with an updated copy (copy-on-write) instead of changing it in place.
+    Web requests grab the current web_data once and read from it; swapping in a whole new dictionary is a single
+    step in Python, so readers always see a complete, consistent snapshot and nobody has to wait on a lock.
+    Only the main thread calls this.
+    Non-programmer: Like pinning a freshly printed notice over the old one, instead of editing the old one while people read it.
+
+    Args:
+        **changes: web_data keys to update, e.g. voltages=[...], balancing=True.
+    """
+    global web_data
+    snapshot = dict(web_data)
+    snapshot.update(changes)
+    web_data = snapshot
 
 def check_dependencies():
     """
@@ -382,15 +498,26 @@ def get_bank_for_channel(ch):
     Returns:
         int: Bank number (1 to num_series_banks) or None if the channel is invalid or out of range.
     """
-    # Loop through each bank (starting from bank 1).
-    # enumerate(BANK_SENSOR_INDICES, 1) gives bank_id (1,2,3...) and its list of sensor indices (0-based).
-    for bank_id, indices in enumerate(BANK_SENSOR_INDICES, 1):
-        # Check if the 0-based version of ch (ch-1) is in this bank's sensor list.
-        if ch - 1 in indices:
-            return bank_id  # Found it—return the bank number.
-    # If not found in any bank, it's invalid.
+    # Look the channel up directly in the precomputed CHANNEL_TO_BANK list (built once in main()).
+    # Channels outside the list, or slots marked 0, don't belong to any bank, so they're invalid.
+    if 0 < ch < len(CHANNEL_TO_BANK):
+        return CHANNEL_TO_BANK[ch] or None
     return None
 
+def event_time_str():
+    """
+    Current local time as 'YYYY-MM-DD HH:MM:SS' for event log entries.
+    The text only changes once a second, so it is formatted once per second and reused for every event in between.
+
+    Returns:
+        str: Formatted timestamp.
+    """
+    global event_time_cache
+    now = int(time.time())
+    if event_time_cache[0] != now:
+        event_time_cache = (now, time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(now)))
+    return event_time_cache[1]
+
 def get_battery_and_local_ch(ch):
     """
     Find the parallel battery ID and local channel for a global channel.
@@ -405,14 +532,39 @@ def get_battery_and_local_ch(ch):
     Returns:
         tuple: (battery_id, local_ch) - battery number (1+), local channel (1 to sensors_per_battery).
     """
-    # Hardcoded: Each parallel battery has 24 sensors (num_series_banks * sensors_per_bank, assuming 3*8=24).
-    sensors_per_battery = 24
-    # Calculate which battery: Divide global index (0-based) by sensors per battery, add 1 for 1-based.
-    bat_id = ((ch - 1) // sensors_per_battery) + 1
-    # Local channel: Remainder of division, add 1 for 1-based.
-    local_ch = ((ch - 1) % sensors_per_battery) + 1
-    # Return as a pair (tuple).
-    return bat_id, local_ch
+    # Normal case: read the answer from the table built once in main().
+    if 0 < ch < len(CHANNEL_TO_BATTERY_LOCAL):
+        return CHANNEL_TO_BATTERY_LOCAL[ch]
+    # Otherwise work it out. Each parallel battery has SENSORS_PER_BATTERY sensors (num_series_banks * sensors_per_bank, set from config in main()).
+    # divmod gives both answers in one step: which battery (quotient) and position within it (remainder), both 0-based.
+    bat_idx, local_idx = divmod(ch - 1, SENSORS_PER_BATTERY)
+    # Return as a pair (tuple), converted to 1-based.
+    return bat_idx + 1, local_idx + 1
+
+def _build_crc16_table():
+    """
+    Build the 256-entry lookup table used by modbus_crc.
+    Each entry is what the original bit-by-bit Modbus CRC loop produces for one byte value, worked out once at startup.
+    Non-programmer analogy: Like printing a multiplication table once instead of doing long multiplication every time.
+
+    Returns:
+        tuple: 256 precomputed 16-bit CRC values - one per possible byte.
+    """
+    table = [] # Empty list to hold the 256 answers.
+    # Work out the CRC contribution of every possible byte value (0 to 255).
+    for byte in range(256):
+        crc = byte # Start from the byte itself.
+        # For 8 bits in the byte, shift and possibly XOR with polynomial (same steps as the classic Modbus loop).
+        for _ in range(8):
+            if crc & 0x0001:
+                crc = (crc >> 1) ^ 0xA001
+            else:
+                crc >>= 1
+        table.append(crc) # Save the answer for this byte.
+    # Freeze as a tuple - it never changes after startup.
+    return tuple(table)
+
+_CRC16_TABLE = _build_crc16_table() # Precomputed Modbus CRC table - built once when the script loads.
 
 def modbus_crc(data):
     """
@@ -420,6 +572,7 @@ def modbus_crc(data):
     Modbus is a protocol for talking to industrial devices like temperature sensors. CRC is like a fingerprint
     that verifies the message wasn't garbled during transmission (e.g., by electrical noise on wires).
     This function computes the CRC-16 checksum using the Modbus polynomial (0xA001), which is standard for error checking.
+    It uses the precomputed _CRC16_TABLE, so each byte costs one table lookup instead of 8 shift/XOR steps.
     Non-programmer analogy: Like double-checking a phone number by repeating it—ensures no digits were misheard.
 
     Args:
@@ -430,25 +583,36 @@ def modbus_crc(data):
     """
     # Start with initial CRC value of 0xFFFF (standard for Modbus).
     crc = 0xFFFF
-    # Process each byte in the data.
+    table = _CRC16_TABLE # Local name for faster lookups inside the loop.
+    # Process each byte in the data: one table lookup replaces the 8-bit inner loop.
     for byte in data:
-        # XOR the current CRC with the byte (combines them bitwise).
-        crc ^= byte
-        # For 8 bits in the byte, shift and possibly XOR with polynomial.
-        for _ in range(8):
-            # If least significant bit is 1, shift right and XOR with 0xA001 (Modbus poly).
-            if crc & 0x0001:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                # Just shift right if LSB is 0.
-                crc >>= 1
+        crc = (crc >> 8) ^ table[(crc ^ byte) & 0xFF]
     # Convert the 16-bit CRC to 2 bytes, little-endian (low byte first).
     return crc.to_bytes(2, 'little')
 
+def build_modbus_read_query(slave_addr, num_channels):
+    """
+    Build the complete Modbus "read holding registers" request for registers 0..num_channels-1 of one slave.
+    The request only depends on the slave address and channel count, so the regular poll requests are built once in
+    load_config and reused; one-off reads (like the 1-channel startup checks) build theirs on the fly.
+
+    Args:
+        slave_addr (int): Modbus slave address.
+        num_channels (int): Number of registers (sensors) to read.
+
+    Returns:
+        bytes: 8-byte request frame including CRC.
+    """
+    # Slave addr (1 byte) + function code 3 (1 byte) + start addr (2 bytes) + num registers (2 bytes), big-endian.
+    query_base = struct.pack('>BBHH', slave_addr, 3, 0, num_channels)
+    return query_base + modbus_crc(query_base)
+
 def test_modbus_connectivity(ip, port):
     """
     Test network connectivity to the Modbus device.
     Attempts a socket connection with a short timeout to check if the device is reachable.
+    The result is reused for MODBUS_PROBE_CACHE_SECONDS, so several failing slaves on one port (or several retries)
+    during an outage don't each wait out their own connect timeout.
     Non-programmer analogy: Like knocking on a door to see if someone is home.
 
     Args:
@@ -458,46 +622,261 @@ def test_modbus_connectivity(ip, port):
     Returns:
         bool: True if connection succeeds, False otherwise.
     """
+    key = (ip, port)
+    cached = modbus_probe_cache.get(key)
+    now = time.monotonic()
+    if cached is not None and now - cached[0] < MODBUS_PROBE_CACHE_SECONDS:
+        return cached[1]
     try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        s.settimeout(1)  # 1 second timeout
-        s.connect((ip, port))
+        s = open_modbus_socket(ip, port, 1)  # 1 second timeout
         s.close()
-        return True
+        reachable = True
+    except socket.error:
+        reachable = False
+    modbus_probe_cache[key] = (time.monotonic(), reachable)
+    return reachable
+
+def modbus_ping(ip, port, slave_addr, timeout=0.5):
+    """
+    Quick "are you there?" check for one Modbus slave, for startup hardware detection.
+    Sends a read of 1 register on a short-lived connection and waits at most `timeout` seconds for the reply,
+    with no retries, back-off or network diagnosis - an absent slave costs half a second instead of the full read path's waits.
+    The whole reply is read before hanging up, so no stray bytes are left in the Lantronix for the next connection.
+
+    Args:
+        ip (str): IP address of the Modbus device.
+        port (int): Port number.
+        slave_addr (int): Modbus slave address.
+        timeout (float): Max seconds for connecting and for the reply.
+
+    Returns:
+        bool: True if the slave sent back a complete, CRC-checked normal reply (not a Modbus exception), False otherwise.
+    """
+    expected = 7  # Reply to a 1-register read: addr + function + byte count + 2 data + 2 CRC.
+    try:
+        s = open_modbus_socket(ip, port, timeout)
     except socket.error:
         return False
+    try:
+        s.settimeout(timeout)
+        s.sendall(build_modbus_read_query(slave_addr, 1))
+        reply = b''
+        while len(reply) < expected:
+            chunk = s.recv(expected - len(reply))
+            if not chunk:
+                break
+            reply += chunk
+            # Exception reply (function code with the high bit set) is only 5 bytes.
+            if len(reply) >= 2 and reply[1] & 0x80:
+                expected = 5
+        # Only a complete frame with a good CRC counts - a stray or garbled byte pair from another device doesn't.
+        if len(reply) != expected or modbus_crc(reply) != b'\x00\x00':
+            return False
+        return reply[0] == slave_addr and reply[1] == 3 and reply[2] == 2
+    except socket.error:
+        return False
+    finally:
+        s.close()
+
+def open_modbus_socket(ip, port, connect_timeout):
+    """
+    Open a tuned TCP connection to a Modbus device.
+    Sets a large receive buffer (before connecting, so the connection can advertise it) and TCP_NODELAY, then connects
+    without blocking and uses select to wait at most connect_timeout for the connection to complete.
+    Non-programmer analogy: Like dialling and watching the clock, hanging up if nobody answers in time.
+
+    Args:
+        ip (str): IP address of the Modbus device.
+        port (int): Port number.
+        connect_timeout (float): Max seconds to wait for the connection.
+
+    Returns:
+        socket.socket: Connected socket, in blocking mode with connect_timeout as its timeout.
+
+    Raises:
+        socket.timeout: If the connection doesn't complete in time.
+        OSError: If the connection is refused or the network is unreachable.
+    """
+    s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    try:
+        s.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, MODBUS_RCVBUF)
+        s.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # Start connecting without waiting.
+        s.setblocking(False)
+        err = s.connect_ex((ip, port))
+        if err not in (0, errno.EINPROGRESS, errno.EWOULDBLOCK):
+            raise OSError(err, os.strerror(err))
+        if err:
+            # Wait until the socket is writable (= connected or failed), or give up.
+            _, writable, _ = select.select([], [s], [], connect_timeout)
+            if not writable:
+                raise socket.timeout(f"Connect to {ip}:{port} timed out")
+            err = s.getsockopt(socket.SOL_SOCKET, socket.SO_ERROR)
+            if err:
+                raise OSError(err, os.strerror(err))
+        # Back to blocking (with a timeout) so callers' sendall/recv wait normally instead of raising BlockingIOError.
+        s.settimeout(connect_timeout)
+        return s
+    except BaseException:
+        s.close()
+        raise
+
+def get_modbus_socket(ip, port):
+    """
+    Get the open Modbus TCP connection for (ip, port), connecting if there isn't one yet.
+    Keeping one connection per port open between polls saves a TCP handshake per read. TCP_NODELAY (set in
+    open_modbus_socket) sends the small query packet immediately instead of holding it back, and SO_KEEPALIVE lets the OS notice a dead link.
+    Non-programmer analogy: Like keeping a phone line open instead of redialling for every question.
+
+    Args:
+        ip (str): IP address of the Modbus device.
+        port (int): Port number.
+
+    Returns:
+        tuple: (socket, reused) - the connection, and True if it was already open before this call.
+    """
+    key = (ip, port)
+    s = modbus_sockets.get(key)
+    if s is not None:
+        return s, True
+    s = open_modbus_socket(ip, port, MODBUS_CONNECT_TIMEOUT)
+    s.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+    modbus_sockets[key] = s
+    return s, False
+
+def close_modbus_socket(ip, port):
+    """
+    Close and forget the kept-open Modbus connection for (ip, port), if any.
+    Called after any error so the next read starts on a fresh connection with no leftover bytes.
 
-def read_ntc_sensors(ip, modbus_port, query_delay, num_channels, scaling_factor, max_retries, retry_backoff_base, slave_addr=1):
+    Args:
+        ip (str): IP address of the Modbus device.
+        port (int): Port number.
+    """
+    s = modbus_sockets.pop((ip, port), None)
+    if s is not None:
+        try:
+            s.close()
+        except OSError:
+            pass
+
+def close_all_modbus_sockets():
+    """
+    Close every kept-open Modbus connection (used at shutdown).
+    """
+    for ip, port in list(modbus_sockets):
+        close_modbus_socket(ip, port)
+
+def modbus_exchange(ip, port, query, expected_response_length, query_delay):
+    """
+    Send one Modbus query over the kept-open connection and collect the response.
+    The reply is read as soon as it arrives (recv waits for data instead of a fixed sleep) and stops at the expected
+    frame length, or at 5 bytes for a Modbus exception reply. query_delay is only enforced as a quiet gap between
+    consecutive frames on the same port, so back-to-back slaves on one RS485 line get their turn-around time.
+    If a reused connection turns out to be dead (the device dropped it while idle), reconnects once straight away
+    instead of failing the read. Any other error closes the connection and is passed on to the caller.
+
+    Args:
+        ip (str): IP address of the Modbus device.
+        port (int): Port number.
+        query (bytes): Complete Modbus frame including CRC.
+        expected_response_length (int): Bytes expected back for a normal reply.
+        query_delay (float): Minimum gap since the previous reply on this port before sending (in seconds).
+
+    Returns:
+        bytes: Raw response (may be shorter than expected if the device stopped early).
+    """
+    key = (ip, port)
+    s, reused = get_modbus_socket(ip, port)
+    try:
+        # For 9600 half-duplex: give the RS485 line its turn-around time (typically 50-100ms) if the previous
+        # reply on this port only just finished. The first query of a poll doesn't wait at all.
+        gap = query_delay - (time.monotonic() - modbus_last_exchange.get(key, 0.0))
+        if gap > 0:
+            time.sleep(gap)
+        # Send query. Reset the timeout first: a reused socket still carries whatever short timeout the last read left.
+        s.settimeout(MODBUS_RECV_TIMEOUT)
+        s.sendall(query)
+        # Read response as it arrives: 5 seconds for the first bytes on slow devices (at 9600 baud, 1 char takes ~1ms),
+        # then up to 2 seconds for the rest of the frame. recv asks for exactly the bytes still missing.
+        max_wait_time = 2.0  # Max 2 seconds for full response
+        # Receive straight into one buffer sized for the whole reply (no per-chunk bytes objects to join).
+        response = bytearray(expected_response_length)
+        view = memoryview(response)
+        got = 0
+        deadline = time.monotonic() + MODBUS_RECV_TIMEOUT
+        while got < expected_response_length:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                if not got:
+                    raise socket.timeout("No response from device")
+                break
+            s.settimeout(remaining)
+            try:
+                n = s.recv_into(view[got:expected_response_length])
+            except socket.timeout:
+                if not got:
+                    raise
+                break
+            if not n:
+                if not got:
+                    # Empty read = the device closed the connection.
+                    raise ConnectionError("Connection closed by device")
+                break
+            if not got:
+                deadline = time.monotonic() + max_wait_time
+            got += n
+            # Exception replies (function code with the high bit set) are only 5 bytes long - don't wait for more.
+            if got >= 2 and response[1] & 0x80:
+                expected_response_length = 5
+        view.release()
+        return bytes(response[:got])
+    except ConnectionError:
+        close_modbus_socket(ip, port)
+        if not reused:
+            raise
+        # Stale kept-open connection: reconnect once and try again on a fresh line.
+        logging.debug("Modbus connection to %s:%s was stale, reconnecting.", ip, port)
+        return modbus_exchange(ip, port, query, expected_response_length, query_delay)
+    except OSError:
+        # Timeouts and other socket errors: drop the connection and let the caller's retry logic decide.
+        close_modbus_socket(ip, port)
+        raise
+    finally:
+        modbus_last_exchange[key] = time.monotonic()
+
+def read_ntc_sensors(ip, modbus_port, query_delay, num_channels, scaling_factor, max_retries, retry_backoff_base, slave_addr=1, query=None):
     """
     Read temperature measurements from NTC thermistor sensors.
     Improved for 9600 baud half-duplex Modbus communication.
     
     Key improvements for reliable 9600 half-duplex:
-    - Increased query_delay to allow device processing time at slow baud rate
-    - Progressive receive timeout to detect end of response frame
+    - query_delay keeps back-to-back frames on one RS485 line apart (device turn-around time)
+    - Reply read as soon as it arrives, until the expected frame length or a timeout
     - Response validation with length and CRC checks
     - Better error handling and retry logic
     
     Args:
         ip (str): The IP address of the Modbus device.
         modbus_port (int): The Modbus TCP port.
-        query_delay (float): Delay after sending query (in seconds).
+        query_delay (float): Minimum gap between frames on the same port (in seconds).
         num_channels (int): Number of temperature sensors to read.
         scaling_factor (float): Factor to convert raw to Celsius.
         max_retries (int): Number of retry attempts on failure.
         retry_backoff_base (int): Base for exponential backoff.
         slave_addr (int): Modbus slave address (default 1).
+        query (bytes): Prebuilt request from build_modbus_read_query (default: build it here).
     
     Returns:
         list or str: List of temperatures or error message string.
     """
-    # Log start of read.
-    logging.info(f"Starting temp read for slave {slave_addr}.")
+    # Log start of read. (Log values are passed as arguments, not f-strings, in this per-poll function: logging only
+    # builds the message text when that level is actually enabled.)
+    logging.info("Starting temp read for slave %s.", slave_addr)
     
-    # Build Modbus query packet: Slave addr + function code 3 + start addr + num registers.
-    query_base = bytes([slave_addr, 3]) + (0).to_bytes(2, 'big') + (num_channels).to_bytes(2, 'big')
-    crc = modbus_crc(query_base)
-    query = query_base + crc
+    # All channels come back from a single range read (registers 0..num_channels-1), one round trip per slave.
+    if query is None:
+        query = build_modbus_read_query(slave_addr, num_channels)
     
     # Calculate expected response length: 3 header bytes + byte_count (2 per channel) + 2 CRC
     expected_data_length = num_channels * 2
@@ -507,131 +886,152 @@ def read_ntc_sensors(ip, modbus_port, query_delay, num_channels, scaling_factor,
     
     for attempt in range(max_retries):
         try:
-            logging.debug(f"Temp read attempt {attempt+1} for slave {slave_addr}: {ip}:{modbus_port}")
-            
-            # Create socket with proper timeout for 9600 baud
-            # At 9600 baud, 1 char takes ~1ms, so we need longer timeouts
-            s = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            s.settimeout(5)  # 5 second timeout for slow devices
-            
-            # Connect
-            s.connect((ip, modbus_port))
+            logging.debug("Temp read attempt %s for slave %s: %s:%s", attempt+1, slave_addr, ip, modbus_port)
             
-            # Send query
-            s.send(query)
-            
-            # For 9600 half-duplex: Wait longer for device to process
-            # At 9600 baud, a ~19 byte request takes ~20ms to transmit
-            # Plus device processing time (typically 50-100ms for RS485 turn-around)
-            time.sleep(query_delay)
-            
-            # Read response with progressive timeout
-            # For half-duplex, we need to wait for the complete frame
-            response = b''
-            chunk = s.recv(256)
-            response += chunk
-            
-            # Progressive read: wait for more data if response is incomplete
-            # This handles slow response times on 9600 baud
-            max_wait_time = 2.0  # Max 2 seconds for full response
-            wait_start = time.time()
-            while len(response) < expected_response_length and (time.time() - wait_start) < max_wait_time:
-                time.sleep(0.1)  # Short sleep between checks
-                chunk = s.recv(256)
-                if chunk:
-                    response += chunk
-                else:
-                    break
-            
-            s.close()
+            # Send the query and collect the reply over the kept-open connection for this port.
+            response = modbus_exchange(ip, modbus_port, query, expected_response_length, query_delay)
             
             # Validate response length
             if len(response) < 5:
-                logging.warning(f"Short response from slave {slave_addr}: {len(response)} bytes (expected {expected_response_length})")
+                logging.warning("Short response from slave %s: %s bytes (expected %s)", slave_addr, len(response), expected_response_length)
                 raise ValueError(f"Short response: {len(response)} bytes")
             
             # Validate response length matches expected
             if len(response) != expected_response_length:
-                logging.warning(f"Response length mismatch for slave {slave_addr}: got {len(response)}, expected {expected_response_length}")
+                logging.warning("Response length mismatch for slave %s: got %s, expected %s", slave_addr, len(response), expected_response_length)
                 # Don't fail on length mismatch, let CRC validation handle it
             
-            # Validate CRC
-            calc_crc = modbus_crc(response[:-2])
-            if calc_crc != response[-2:]:
-                logging.warning(f"CRC mismatch for slave {slave_addr}")
+            # Validate CRC in one pass over the whole frame: running the CRC over data + its own (little-endian) CRC
+            # always gives zero for an intact frame, so there's no need to split off and compare the last two bytes.
+            if modbus_crc(response) != b'\x00\x00':
+                logging.warning("CRC mismatch for slave %s", slave_addr)
                 raise ValueError("CRC mismatch")
             
             # Validate header
             slave, func, byte_count = response[0:3]
             if slave != slave_addr:
-                logging.warning(f"Slave address mismatch for slave {slave_addr}: got {slave}")
+                logging.warning("Slave address mismatch for slave %s: got %s", slave_addr, slave)
                 raise ValueError("Slave address mismatch")
             
             if func != 3:
                 if func & 0x80:
                     return f"Error: Modbus exception code {response[2]} for slave {slave_addr}"
-                logging.warning(f"Invalid function code for slave {slave_addr}: {func}")
+                logging.warning("Invalid function code for slave %s: %s", slave_addr, func)
                 raise ValueError("Invalid function code")
             
             if byte_count != expected_data_length:
-                logging.warning(f"Byte count mismatch for slave {slave_addr}: got {byte_count}, expected {expected_data_length}")
+                logging.warning("Byte count mismatch for slave %s: got %s, expected %s", slave_addr, byte_count, expected_data_length)
                 raise ValueError("Byte count mismatch")
             
-            # Extract temperature data (2 bytes per channel, big-endian signed)
-            data = response[3:3 + byte_count]
-            raw_temperatures = []
-            for i in range(0, len(data), 2):
-                val = int.from_bytes(data[i:i+2], 'big', signed=True) / scaling_factor
-                raw_temperatures.append(val)
+            # Extract temperature data (2 bytes per channel, big-endian signed), all channels in one unpack starting after the 3 header bytes.
+            raw_temperatures = [val / scaling_factor for val in struct.unpack_from(f'>{byte_count // 2}h', response, 3)]
             
-            logging.info(f"Temp read successful for slave {slave_addr}: {len(raw_temperatures)} values")
+            logging.info("Temp read successful for slave %s: %s values", slave_addr, len(raw_temperatures))
             return raw_temperatures
             
         except socket.error as e:
-            logging.warning(f"Temp read attempt {attempt+1} for slave {slave_addr} failed: {str(e)}")
-            time.sleep(3)
+            logging.warning("Temp read attempt %s for slave %s failed: %s", attempt+1, slave_addr, e)
+            time.sleep(min(3, retry_backoff_base ** attempt))
             
             if test_modbus_connectivity(ip, modbus_port):
-                logging.warning(f"Network up, treating as device error for slave {slave_addr}")
+                logging.warning("Network up, treating as device error for slave %s", slave_addr)
                 if attempt < max_retries - 1:
                     time.sleep(retry_backoff_base ** attempt)
                 else:
-                    logging.error(f"Temp read failed after {max_retries} attempts for slave {slave_addr}")
+                    logging.error("Temp read failed after %s attempts for slave %s", max_retries, slave_addr)
                     return f"Error: Failed after {max_retries} attempts for slave {slave_addr}"
             else:
                 network_retry_count += 1
                 if network_retry_count < 3:
-                    logging.warning(f"Network down, retrying ({network_retry_count}/3) for slave {slave_addr}")
+                    logging.warning("Network down, retrying (%s/3) for slave %s", network_retry_count, slave_addr)
                     continue
                 else:
-                    logging.error(f"Network down after 3 retries for slave {slave_addr}")
+                    logging.error("Network down after 3 retries for slave %s", slave_addr)
                     return f"Error: Network unreachable for slave {slave_addr}"
                     
         except ValueError as e:
-            logging.warning(f"Temp read validation failed for slave {slave_addr}: {str(e)}")
-            time.sleep(3)
+            logging.warning("Temp read validation failed for slave %s: %s", slave_addr, e)
+            # Drop the connection so leftover bytes from a bad reply can't confuse the next read.
+            close_modbus_socket(ip, modbus_port)
+            time.sleep(min(3, retry_backoff_base ** attempt))
             
             if test_modbus_connectivity(ip, modbus_port):
                 if attempt < max_retries - 1:
                     time.sleep(retry_backoff_base ** attempt)
                 else:
-                    logging.error(f"Temp read failed after {max_retries} attempts for slave {slave_addr}")
+                    logging.error("Temp read failed after %s attempts for slave %s", max_retries, slave_addr)
                     return f"Error: Failed after {max_retries} attempts for slave {slave_addr}"
             else:
                 network_retry_count += 1
                 if network_retry_count < 3:
-                    logging.warning(f"Network down, retrying ({network_retry_count}/3) for slave {slave_addr}")
+                    logging.warning("Network down, retrying (%s/3) for slave %s", network_retry_count, slave_addr)
                     continue
                 else:
-                    logging.error(f"Network down after 3 retries for slave {slave_addr}")
+                    logging.error("Network down after 3 retries for slave %s", slave_addr)
                     return f"Error: Network unreachable for slave {slave_addr}"
                     
         except Exception as e:
-            logging.error(f"Unexpected error in temp read for slave {slave_addr}: {str(e)}")
+            logging.error("Unexpected error in temp read for slave %s: %s", slave_addr, e)
             return f"Error: Unexpected failure for slave {slave_addr}"
     
     return f"Error: All retries exhausted for slave {slave_addr}"
 
+def run_per_port(settings, slave_job):
+    """
+    Run slave_job(port, slave_addr) for every Modbus slave, working on different ports at the same time.
+    Slaves on the same port share one RS485 wire behind the Lantronix, so they must still be asked one after another;
+    but each port is its own line, so one worker thread per port handles its slaves while the other ports run in parallel.
+    The whole round then takes about as long as the slowest port instead of the sum of all slaves.
+    Non-programmer analogy: Like several cashiers each serving their own queue, instead of one cashier serving everybody.
+
+    Args:
+        settings (dict): Configuration (ports and slave addresses).
+        slave_job (callable): Called as slave_job(port, slave_addr); its return value is collected.
+
+    Returns:
+        dict: slave address -> whatever slave_job returned for it.
+    """
+    # Group slaves by their port, keeping configured order within each port.
+    slaves_by_port = {}
+    for addr in settings['modbus_slave_addresses']:
+        port = get_port_for_slave(addr, settings['modbus_slave_port_map'], settings['modbus_port'])
+        slaves_by_port.setdefault(port, []).append(addr)
+    # Worker job: handle every slave on one port in turn (this thread is the only one using that port's connection).
+    def run_port(port, addrs):
+        return {addr: slave_job(port, addr) for addr in addrs}
+    # Single port (or no pool yet): nothing to overlap, run directly.
+    if modbus_poll_pool is None or len(slaves_by_port) < 2:
+        results = {}
+        for port, addrs in slaves_by_port.items():
+            results.update(run_port(port, addrs))
+        return results
+    # Start one job per port, then collect them all.
+    futures = [modbus_poll_pool.submit(run_port, port, addrs) for port, addrs in slaves_by_port.items()]
+    results = {}
+    for future in futures:
+        results.update(future.result())
+    return results
+
+def read_all_slaves(settings, num_channels, max_retries=None):
+    """
+    Read temperatures from every Modbus slave, reading different ports at the same time (see run_per_port).
+
+    Args:
+        settings (dict): Configuration (ip, ports, slave addresses, read parameters).
+        num_channels (int): Sensors per slave (registers to read).
+        max_retries (int): Attempts per slave (default: settings['max_retries']; the startup tests use 1).
+
+    Returns:
+        dict: slave address -> list of temperatures, or error message string (same as read_ntc_sensors).
+    """
+    if max_retries is None:
+        max_retries = settings['max_retries']
+    # Full-battery reads use the requests prebuilt in load_config; other sizes are built per read.
+    queries = settings['modbus_queries'] if num_channels == settings['sensors_per_battery'] else {}
+    return run_per_port(settings, lambda port, addr: read_ntc_sensors(
+        settings['ip'], port, settings['query_delay'], num_channels, settings['scaling_factor'],
+        max_retries, settings['retry_backoff_base'], slave_addr=addr, query=queries.get(addr)))
+
 def load_config(data_dir):
     """
     Load and parse the configuration from the 'battery_monitor.ini' file.
@@ -649,8 +1049,6 @@ def load_config(data_dir):
     """
     # Log the start of config loading.
     logging.info("Loading configuration from 'battery_monitor.ini'.")
-    # Global: Reset alert states dictionary.
-    global alert_states
     # Check if config has been read; if empty sections, file is missing or invalid.
     if not config_parser.sections():
         logging.error("Config file 'battery_monitor.ini' not found or empty.")
@@ -669,7 +1067,7 @@ def load_config(data_dir):
         'valid_min': config_parser.getfloat('Temp', 'valid_min', fallback=0.0),  # Minimum valid reading (below = disconnected).
         'max_retries': config_parser.getint('Temp', 'max_retries', fallback=3),  # Read retries.
         'retry_backoff_base': config_parser.getint('Temp', 'retry_backoff_base', fallback=1),  # Backoff multiplier.
-        'query_delay': config_parser.getfloat('Temp', 'query_delay', fallback=0.25),  # Modbus response wait.
+        'query_delay': config_parser.getfloat('Temp', 'query_delay', fallback=0.25),  # Gap between Modbus frames on one port.
         'abs_deviation_threshold': config_parser.getfloat('Temp', 'abs_deviation_threshold', fallback=2.0),  # Absolute deviation °C.
         'cabinet_over_temp_threshold': config_parser.getfloat('Temp', 'cabinet_over_temp_threshold', fallback=35.0),  # Fan trigger temp.
         'number_of_parallel_batteries': config_parser.getint('Temp', 'number_of_parallel_batteries', fallback=1),  # Number of parallel packs.
@@ -685,6 +1083,11 @@ def load_config(data_dir):
     else:
         # Default to modbus_port for all slaves
         temp_settings['modbus_slave_ports'] = [temp_settings['modbus_port']] * len(temp_settings['modbus_slave_addresses'])
+    # Slave address -> port lookup; slaves without a listed port use modbus_port. Built in reverse so a duplicated address keeps its first port.
+    temp_settings['modbus_slave_port_map'] = {
+        addr: (temp_settings['modbus_slave_ports'][i] if i < len(temp_settings['modbus_slave_ports']) else temp_settings['modbus_port'])
+        for i, addr in reversed(list(enumerate(temp_settings['modbus_slave_addresses'])))
+    }
     # Log configuration for debugging
     logging.info(f"modbus_slave_ports configured: {temp_settings['modbus_slave_ports']}")
     logging.info(f"modbus_slave_addresses: {temp_settings['modbus_slave_addresses']}")
@@ -698,6 +1101,9 @@ def load_config(data_dir):
     temp_settings['sensors_per_battery'] = temp_settings['num_series_banks'] * temp_settings['sensors_per_bank'] # Calc per battery.
     # Total sensors across all parallel batteries.
     temp_settings['total_channels'] = temp_settings['number_of_parallel_batteries'] * temp_settings['sensors_per_battery'] # Total sensors.
+    # Per-slave poll requests (address + register count + CRC never change), built once instead of on every read.
+    temp_settings['modbus_queries'] = {addr: build_modbus_read_query(addr, temp_settings['sensors_per_battery'])
+                                       for addr in temp_settings['modbus_slave_addresses']}
     # Load existing calibration median and offsets from file.
     startup_median, startup_offsets = load_offsets(temp_settings['total_channels'], data_dir)
     # Voltage and general settings from [General] section.
@@ -718,7 +1124,9 @@ def load_config(data_dir):
         'WebInterfaceEnabled': config_parser.getboolean('General', 'WebInterfaceEnabled', fallback=True),  # Enable web dashboard.
         'StartupSelfTestEnabled': config_parser.getboolean('General', 'StartupSelfTestEnabled', fallback=True),  # Run startup checks.
         'WatchdogEnabled': config_parser.getboolean('General', 'WatchdogEnabled', fallback=True),  # Use hardware watchdog.
-        'EventLogSize': config_parser.getint('General', 'EventLogSize', fallback=20)  # Max events to keep in memory.
+        'EventLogSize': config_parser.getint('General', 'EventLogSize', fallback=20),  # Max events to keep in memory.
+        'RRDUpdateBatchSize': max(1, config_parser.getint('General', 'RRDUpdateBatchSize', fallback=1)),  # Samples per RRD write.
+        'RRDCachedAddress': config_parser.get('General', 'RRDCachedAddress', fallback='').strip()  # rrdcached daemon address ('' = none).
     }
     # I2C device addresses (hex).
     i2c_settings = {
@@ -783,17 +1191,25 @@ def load_config(data_dir):
     # Set global logging level based on config (e.g., INFO shows normal events, DEBUG shows everything).
     log_level = getattr(logging, voltage_settings['LoggingLevel'].upper(), logging.INFO)
     logging.getLogger().setLevel(log_level)
-    # Initialize alert states for each channel: Track last alert type and count to avoid spam.
-    alert_states = {ch: {'last_type': None, 'count': 0} for ch in range(1, temp_settings['total_channels'] + 1)}
     # Log success.
     logging.info("Configuration loaded successfully.")
     # Combine all settings into one big dictionary.
     relay_pins = {
         f'Relay{i}_Pin': config_parser.getint('GPIO', f'Relay{i}_Pin', fallback=[17,18,27,22][i]) for i in range(4)
     }
+    # Pin lookup tables for set_relay_connection, built once here so switching relays is just a few GPIO writes:
+    # all four relay pins in order, and for each balancing pair the pins it switches on.
+    relay_pin_list = tuple(relay_pins[f'Relay{i}_Pin'] for i in range(4))
+    relay_pair_pins = {}
+    for key, relays in relay_mapping.items():
+        for relay in relays:
+            if not 0 <= relay < 4:  # Only relays 0-3 exist.
+                logging.warning(f"Invalid relay index {relay} for {key}")
+        relay_pair_pins[key] = tuple(relay_pin_list[relay] for relay in relays if 0 <= relay < 4)
     return {**temp_settings, **voltage_settings, **general_flags, **i2c_settings,
             **gpio_settings, **email_settings, **adc_settings, **calibration_settings,
-            **startup_settings, **web_settings, 'relay_mapping': relay_mapping, **relay_pins}
+            **startup_settings, **web_settings, 'relay_mapping': relay_mapping, **relay_pins,
+            'relay_pin_list': relay_pin_list, 'relay_pair_pins': relay_pair_pins}
 
 def validate_config(settings):
     """
@@ -824,6 +1240,9 @@ def validate_config(settings):
     # Sensors per bank must be positive.
     if settings['sensors_per_bank'] < 1:
         errors.append("sensors_per_bank must be at least 1.")
+    # All of a slave's sensors are fetched in one register read, which Modbus caps at 125 registers.
+    if settings['num_series_banks'] * settings['sensors_per_bank'] > MODBUS_MAX_READ_REGISTERS:
+        errors.append(f"num_series_banks * sensors_per_bank must be at most {MODBUS_MAX_READ_REGISTERS} (Modbus read limit).")
    
     # Parallel batteries must be at least 1.
     if settings['number_of_parallel_batteries'] < 1:
@@ -835,14 +1254,17 @@ def validate_config(settings):
    
     # For relay mapping, ensure every possible pair (high-low) has a mapping.
     if settings.get('relay_mapping'):
-        expected_pairs = []
-        for i in range(1, settings['num_series_banks'] + 1):
-            for j in range(1, settings['num_series_banks'] + 1):
-                if i != j:  # No self-balancing.
-                    expected_pairs.append(f"{i}-{j}")
-        for pair in expected_pairs:
-            if pair not in settings['relay_mapping']:
-                errors.append(f"Relay mapping missing for {pair}.")
+        banks = range(1, settings['num_series_banks'] + 1)
+        expected_pairs = {(i, j) for i in banks for j in banks if i != j}  # No self-balancing.
+        # Configured keys like '1-2' as (high, low) number pairs; malformed keys simply don't count.
+        mapped_pairs = set()
+        for key in settings['relay_mapping']:
+            high, _, low = key.partition('-')
+            if high.isdigit() and low.isdigit():
+                mapped_pairs.add((int(high), int(low)))
+        # Only the missing pairs get an error message.
+        for i, j in sorted(expected_pairs - mapped_pairs):
+            errors.append(f"Relay mapping missing for {i}-{j}.")
    
     # If errors found, log them and raise exception with combined message.
     if errors:
@@ -889,20 +1311,19 @@ def detect_hardware(settings):
         logging.warning("I2C bus not available - hardware detection skipped.")
    
     # Test each Modbus slave individually.
-    # Test Modbus slaves
+    # Test Modbus slaves: a quick ping (1-register read, short timeout, no retries) of every slave on its own port, all ports at once.
+    try:
+        test_results = run_per_port(settings, lambda port, addr: modbus_ping(settings['ip'], port, addr))
+    except Exception as e:
+        # Catch any unexpected issues.
+        logging.warning(f"Modbus slave detection failed: {e}")
+        test_results = {}
     for addr in settings['modbus_slave_addresses']:
-        try:
-            # Try a minimal read (1 channel) to test connectivity.
-            test_result = read_ntc_sensors(settings['ip'], settings['modbus_port'], settings['query_delay'], 1, settings['scaling_factor'], 1, 1, slave_addr=addr)
-            if isinstance(test_result, str):
-                # If error string, log warning.
-                logging.warning(f"Modbus slave {addr} not accessible: {test_result}")
-            else:
-                # List of values means success.
-                logging.info(f"Modbus slave {addr} detected.")
-        except Exception as e:
-            # Catch any unexpected issues.
-            logging.warning(f"Modbus slave {addr} detection failed: {e}")
+        if test_results.get(addr):
+            logging.info(f"Modbus slave {addr} detected.")
+        else:
+            # No (valid) answer, log warning.
+            logging.warning(f"Modbus slave {addr} not accessible: no valid reply to ping.")
    
     # Log completion.
     logging.info("Hardware detection complete.")
@@ -961,12 +1382,13 @@ def setup_hardware(settings):
         ds_list = ['DS:medtemp:GAUGE:120:-20:100']  # Median temp: Gauge type (current value), 120s heartbeat, range -20 to 100°C.
         for i in range(1, settings['num_series_banks'] + 1):
             ds_list.append(f'DS:volt{i}:GAUGE:120:0:25')  # Voltage per bank: 0-25V range.
-        # Run rrdtool create command: File, step 60s, DS list, Round-Robin Archives (RRA) for storage.
+        # Run rrdtool create: File, step 60s, DS list, Round-Robin Archives (RRA) for storage.
         # RRA: LAST consolidation, 0% XFF (no nulls tolerated), step 1 for 1440 points (~1 day), step 5 for 288 points (longer term).
-        subprocess.check_call(['rrdtool', 'create', RRD_FILE,
-                               '--step', '60'] + ds_list +
-                               ['RRA:LAST:0.0:1:1440',
-                                'RRA:LAST:0.0:5:288'])
+        create_args = [RRD_FILE, '--step', '60'] + ds_list + ['RRA:LAST:0.0:1:1440', 'RRA:LAST:0.0:5:288']
+        if rrdtool is not None:
+            rrdtool.create(*create_args)  # Native binding: no extra process.
+        else:
+            rrd_pipe_command(['create'] + create_args)
         logging.info("Created RRD database for time-series logging.")
     # Try to set up RRD: Create if missing, or validate existing.
     try:
@@ -976,9 +1398,12 @@ def setup_hardware(settings):
         else:
             # File exists—check schema with rrdtool info.
             try:
-                output = subprocess.check_output(['rrdtool', 'info', RRD_FILE])
-                # Count DS lines in output.
-                ds_count = len([line for line in output.decode().split('\n') if line.startswith('ds[')])
+                if rrdtool is not None:
+                    info_keys = rrdtool.info(RRD_FILE).keys()  # Native binding: a dict of 'ds[name].field' -> value.
+                else:
+                    info_keys = [line.split(' = ')[0] for line in rrd_pipe_command(['info', RRD_FILE])]
+                # Count data sources: each has several 'ds[name].field' entries, so count distinct names.
+                ds_count = len({key.split(']')[0] for key in info_keys if key.startswith('ds[')})
                 # Expected: 1 medtemp + num banks.
                 expected_ds = 1 + settings['num_series_banks']
                 if ds_count != expected_ds:
@@ -988,17 +1413,28 @@ def setup_hardware(settings):
                     create_rrd()
                 else:
                     logging.info("Using existing RRD database with matching schema.")
-            except subprocess.CalledProcessError as e:
+            except RRD_ERRORS as e:
                 # Info command failed—recreate.
                 logging.error(f"RRD info failed: {e}. Recreating database.")
                 os.remove(RRD_FILE)
                 create_rrd()
-    except subprocess.CalledProcessError as e:
+    except RRD_ERRORS as e:
         logging.error(f"RRD creation failed: {e}")
     except FileNotFoundError:
         logging.error("rrdtool not found. Please install rrdtool (sudo apt install rrdtool).")
     except OSError as e:
         logging.error(f"RRD file operation failed: {e}")
+    # Warm the RRD file into the page cache now, so the first updates don't stall on disk reads (SD cards are slow).
+    # Linux only - posix_fadvise is missing on some platforms, and a failure here is harmless.
+    if hasattr(os, 'posix_fadvise') and os.path.exists(RRD_FILE):
+        try:
+            fd = os.open(RRD_FILE, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)  # 0, 0 = the whole file.
+            finally:
+                os.close(fd)
+        except OSError as e:
+            logging.debug(f"Could not prefetch RRD file: {e}")
     # Log completion.
     logging.info("Hardware setup complete, including RRD initialization.")
     # Run detection after setup.
@@ -1024,10 +1460,19 @@ def signal_handler(sig, frame):
     # Global: Stop web server if running.
     global web_server
     if web_server:
-        web_server.shutdown()  # Gracefully shut down Flask server.
+        # Flask's built-in server stops with shutdown(), waitress with close().
+        if hasattr(web_server, 'shutdown'):
+            web_server.shutdown()  # Gracefully shut down Flask server.
+        else:
+            web_server.close()
     # Clean up GPIO: Reset all pins to default (input/low).
     if GPIO:
         GPIO.cleanup()
+    # Write any batched RRD samples so they aren't lost, then stop the rrdtool pipe process.
+    flush_rrd_updates()
+    close_rrd_pipe()
+    # Close kept-open Modbus connections.
+    close_all_modbus_sockets()
     # Disable watchdog to prevent accidental reset during shutdown.
     close_watchdog()
     # Exit with success code 0.
@@ -1055,17 +1500,17 @@ def load_offsets(num_channels, data_dir):
     # Check if file exists.
     if os.path.exists(offsets_path):
         try:
-            # Read all lines from file.
+            # Read all lines from file (without their line endings).
             with open(offsets_path, 'r') as f:
-                lines = f.readlines()
+                lines = f.read().splitlines()
             # Must have at least median line.
             if len(lines) < 1:
                 logging.warning("Invalid offsets.txt; using none.")
                 return None, None
             # Parse median (first line).
-            startup_median = float(lines[0].strip())
+            startup_median = float(lines[0])
             # Parse offsets (rest of lines).
-            offsets = [float(line.strip()) for line in lines[1:]]
+            offsets = [float(line) for line in lines[1:]]
             # Validate count matches channels.
             if len(offsets) != num_channels:
                 logging.warning(f"Invalid offsets count; expected {num_channels}, got {len(offsets)}. Using none.")
@@ -1103,18 +1548,15 @@ def save_offsets(startup_median, startup_offsets, data_dir):
     try:
         # Open file for writing (overwrites existing).
         with open(offsets_path, 'w') as f:
-            # Write median first.
-            f.write(f"{startup_median}\n")
-            # Write each offset on a line.
-            for offset in startup_offsets:
-                f.write(f"{offset}\n")
+            # Median first, then each offset on its own line - built as one string and written in one go.
+            f.write(f"{startup_median}\n" + "".join(f"{offset}\n" for offset in startup_offsets))
         # Log success.
         logging.debug("Offsets saved.")
     except IOError as e:
         # File write error (e.g., permissions).
         logging.error(f"Failed to save offsets: {e}")
 
-def check_invalid_reading(raw, ch, alerts, valid_min, settings):
+def check_invalid_reading(raw, ch, alerts, valid_min):
     """
     Check if a raw temperature reading is invalid (disconnected sensor).
     If reading <= valid_min (e.g., 0°C), it's likely a disconnected or failed sensor.
@@ -1126,31 +1568,27 @@ def check_invalid_reading(raw, ch, alerts, valid_min, settings):
         ch (int): Global channel number (1-based).
         alerts (list): List to append alert strings to.
         valid_min (float): Minimum valid temperature threshold.
-        settings (dict): Config for event logging size.
     
     Returns:
         bool: True if invalid (alert added), False otherwise.
     """
     # Check if raw is invalid.
     if raw <= valid_min:
-        # Get bank and battery/local details for descriptive alert.
-        bank = get_bank_for_channel(ch)
-        bat_id, local_ch = get_battery_and_local_ch(ch)
+        # Get the 'Battery X Bank Y Local Ch Z' label for descriptive alert (prebuilt per channel in main()).
+        prefix = CHANNEL_ALERT_PREFIX[ch]
         # Build alert message with details.
-        alert = f"Battery {bat_id} Bank {bank} Local Ch {local_ch}: Invalid reading (≤ {valid_min})."
+        alert = f"{prefix}: Invalid reading (≤ {valid_min})."
         # Add to alerts list.
         alerts.append(alert)
         # Add to event log with timestamp.
-        event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-        # Trim log if too long.
-        if len(event_log) > settings.get('EventLogSize', 20):
-            event_log.pop(0)
+        event_log.append(f"{poll_time_str}: {alert}")
+        # (event_log is a bounded deque, so the oldest entry drops off on its own.)
         # Log warning.
-        logging.warning(f"Invalid reading on Battery {bat_id} Bank {bank} Local Ch {local_ch}: {raw} ≤ {valid_min}.")
+        logging.warning("Invalid reading on %s: %s ≤ %s.", prefix, raw, valid_min)
         return True  # Invalid.
     return False  # Valid.
 
-def check_high_temp(calibrated, ch, alerts, high_threshold, settings):
+def check_high_temp(calibrated, ch, alerts, high_threshold):
     """
     Check if calibrated temperature exceeds high threshold.
     If temp > high_threshold (e.g., 42°C), it's overheating—add alert and log.
@@ -1161,7 +1599,6 @@ def check_high_temp(calibrated, ch, alerts, high_threshold, settings):
         ch (int): Channel number.
         alerts (list): List for alert messages.
         high_threshold (float): Max safe temperature.
-        settings (dict): For event log size.
     
     Returns:
         None
@@ -1169,17 +1606,14 @@ def check_high_temp(calibrated, ch, alerts, high_threshold, settings):
     # Check condition.
     if calibrated > high_threshold:
         # Get details.
-        bank = get_bank_for_channel(ch)
-        bat_id, local_ch = get_battery_and_local_ch(ch)
+        prefix = CHANNEL_ALERT_PREFIX[ch]
         # Alert with value.
-        alert = f"Battery {bat_id} Bank {bank} Local Ch {local_ch}: High temp ({calibrated:.1f}°C > {high_threshold}°C)."
+        alert = f"{prefix}: High temp ({calibrated:.1f}°C > {high_threshold}°C)."
         alerts.append(alert)
-        event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-        if len(event_log) > settings.get('EventLogSize', 20):
-            event_log.pop(0)
-        logging.warning(f"High temp alert on Battery {bat_id} Bank {bank} Local Ch {local_ch}: {calibrated:.1f} > {high_threshold}.")
+        event_log.append(f"{poll_time_str}: {alert}")
+        logging.warning("High temp alert on %s: %.1f > %s.", prefix, calibrated, high_threshold)
 
-def check_low_temp(calibrated, ch, alerts, low_threshold, settings):
+def check_low_temp(calibrated, ch, alerts, low_threshold):
     """
     Check if calibrated temperature is below low threshold.
     If temp < low_threshold (e.g., 0°C), it's too cold—add alert and log.
@@ -1190,22 +1624,18 @@ def check_low_temp(calibrated, ch, alerts, low_threshold, settings):
         ch (int): Channel.
         alerts (list): Alert list.
         low_threshold (float): Min safe temperature.
-        settings (dict): Event log size.
     
     Returns:
         None
     """
     if calibrated < low_threshold:
-        bank = get_bank_for_channel(ch)
-        bat_id, local_ch = get_battery_and_local_ch(ch)
-        alert = f"Battery {bat_id} Bank {bank} Local Ch {local_ch}: Low temp ({calibrated:.1f}°C < {low_threshold}°C)."
+        prefix = CHANNEL_ALERT_PREFIX[ch]
+        alert = f"{prefix}: Low temp ({calibrated:.1f}°C < {low_threshold}°C)."
         alerts.append(alert)
-        event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-        if len(event_log) > settings.get('EventLogSize', 20):
-            event_log.pop(0)
-        logging.warning(f"Low temp alert on Battery {bat_id} Bank {bank} Local Ch {local_ch}: {calibrated:.1f} < {low_threshold}.")
+        event_log.append(f"{poll_time_str}: {alert}")
+        logging.warning("Low temp alert on %s: %.1f < %s.", prefix, calibrated, low_threshold)
 
-def check_deviation(calibrated, bank_median, ch, alerts, abs_deviation_threshold, deviation_threshold, settings):
+def check_deviation(calibrated, bank_median, ch, alerts, abs_deviation_threshold, deviation_threshold):
     """
     Check if sensor temperature deviates too much from its bank's median.
     Deviation can be absolute (e.g., >2°C diff) or relative (e.g., >10% diff)—flags faulty sensor.
@@ -1218,7 +1648,6 @@ def check_deviation(calibrated, bank_median, ch, alerts, abs_deviation_threshold
         alerts (list): Alert list.
         abs_deviation_threshold (float): Absolute diff threshold °C.
         deviation_threshold (float): Relative diff threshold (fraction).
-        settings (dict): Event log.
     
     Returns:
         None
@@ -1229,16 +1658,13 @@ def check_deviation(calibrated, bank_median, ch, alerts, abs_deviation_threshold
     rel_dev = abs_dev / abs(bank_median) if bank_median != 0 else 0
     # Check either threshold exceeded.
     if abs_dev > abs_deviation_threshold or rel_dev > deviation_threshold:
-        bank = get_bank_for_channel(ch)
-        bat_id, local_ch = get_battery_and_local_ch(ch)
-        alert = f"Battery {bat_id} Bank {bank} Local Ch {local_ch}: Deviation from bank median (abs {abs_dev:.1f}°C or {rel_dev:.2%})."
+        prefix = CHANNEL_ALERT_PREFIX[ch]
+        alert = f"{prefix}: Deviation from bank median (abs {abs_dev:.1f}°C or {rel_dev:.2%})."
         alerts.append(alert)
-        event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-        if len(event_log) > settings.get('EventLogSize', 20):
-            event_log.pop(0)
-        logging.warning(f"Deviation alert on Battery {bat_id} Bank {bank} Local Ch {local_ch}: abs {abs_dev:.1f}, rel {rel_dev:.2%}.")
+        event_log.append(f"{poll_time_str}: {alert}")
+        logging.warning("Deviation alert on %s: abs %.1f, rel %.2f%%.", prefix, abs_dev, rel_dev * 100)
 
-def check_abnormal_rise(current, previous_temps, ch, alerts, poll_interval, rise_threshold, settings):
+def check_abnormal_rise(current, previous_temps, ch, alerts, poll_interval, rise_threshold):
     """
     Check for abnormal temperature rise since last poll.
     If increase > rise_threshold (e.g., 2°C in 10s), it might indicate a problem like short circuit.
@@ -1251,7 +1677,6 @@ def check_abnormal_rise(current, previous_temps, ch, alerts, poll_interval, rise
         alerts (list): Alerts.
         poll_interval (float): Time since last read s.
         rise_threshold (float): Max allowed rise °C.
-        settings (dict): Event log.
     
     Returns:
         None
@@ -1260,24 +1685,22 @@ def check_abnormal_rise(current, previous_temps, ch, alerts, poll_interval, rise
     previous = previous_temps[ch-1]
     # Only if previous exists.
     if previous is not None:
-        # Type check for safety (avoid comparing wrong types).
-        if not isinstance(current, (int, float)) or not isinstance(previous, (int, float)):
-            logging.warning(f"Type error in check_abnormal_rise for ch {ch}: current={type(current)} {current}, previous={type(previous)} {previous}")
-            return
+        # Type check for safety (avoid comparing wrong types). Development aid only: skipped under python -O.
+        if __debug__:
+            if not isinstance(current, (int, float)) or not isinstance(previous, (int, float)):
+                logging.warning("Type error in check_abnormal_rise for ch %s: current=%s %s, previous=%s %s", ch, type(current), current, type(previous), previous)
+                return
         # Calculate rise.
         rise = current - previous
         # Check threshold.
         if rise > rise_threshold:
-            bank = get_bank_for_channel(ch)
-            bat_id, local_ch = get_battery_and_local_ch(ch)
-            alert = f"Battery {bat_id} Bank {bank} Local Ch {local_ch}: Abnormal rise ({rise:.1f}°C in {poll_interval}s)."
+            prefix = CHANNEL_ALERT_PREFIX[ch]
+            alert = f"{prefix}: Abnormal rise ({rise:.1f}°C in {poll_interval}s)."
             alerts.append(alert)
-            event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-            if len(event_log) > settings.get('EventLogSize', 20):
-                event_log.pop(0)
-            logging.warning(f"Abnormal rise alert on Battery {bat_id} Bank {bank} Local Ch {local_ch}: {rise:.1f}°C.")
+            event_log.append(f"{poll_time_str}: {alert}")
+            logging.warning("Abnormal rise alert on %s: %.1f°C.", prefix, rise)
 
-def check_group_tracking_lag(current, previous_temps, bank_median_rise, ch, alerts, disconnection_lag_threshold, settings):
+def check_group_tracking_lag(current, previous_temps, bank_median_rise, ch, alerts, disconnection_lag_threshold):
     """
     Check if sensor's change lags behind the bank's median change (possible disconnection).
     If diff in changes > threshold, sensor isn't tracking group—might be loose wire.
@@ -1290,28 +1713,25 @@ def check_group_tracking_lag(current, previous_temps, bank_median_rise, ch, aler
         ch (int): Channel.
         alerts (list): Alerts.
         disconnection_lag_threshold (float): Max lag °C.
-        settings (dict): Event log.
     
     Returns:
         None
     """
     previous = previous_temps[ch-1]
     if previous is not None:
-        if not isinstance(current, (int, float)) or not isinstance(previous, (int, float)):
-            logging.warning(f"Type error in check_group_tracking_lag for ch {ch}: current={type(current)} {current}, previous={type(previous)} {previous}")
-            return
+        if __debug__:
+            if not isinstance(current, (int, float)) or not isinstance(previous, (int, float)):
+                logging.warning("Type error in check_group_tracking_lag for ch %s: current=%s %s, previous=%s %s", ch, type(current), current, type(previous), previous)
+                return
         rise = current - previous
         if abs(rise - bank_median_rise) > disconnection_lag_threshold:
-            bank = get_bank_for_channel(ch)
-            bat_id, local_ch = get_battery_and_local_ch(ch)
-            alert = f"Battery {bat_id} Bank {bank} Local Ch {local_ch}: Lag from bank group ({rise:.1f}°C vs {bank_median_rise:.1f}°C)."
+            prefix = CHANNEL_ALERT_PREFIX[ch]
+            alert = f"{prefix}: Lag from bank group ({rise:.1f}°C vs {bank_median_rise:.1f}°C)."
             alerts.append(alert)
-            event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-            if len(event_log) > settings.get('EventLogSize', 20):
-                event_log.pop(0)
-            logging.warning(f"Lag alert on Battery {bat_id} Bank {bank} Local Ch {local_ch}: rise {rise:.1f} vs median {bank_median_rise:.1f}.")
+            event_log.append(f"{poll_time_str}: {alert}")
+            logging.warning("Lag alert on %s: rise %.1f vs median %.1f.", prefix, rise, bank_median_rise)
 
-def check_sudden_disconnection(current, previous_temps, ch, alerts, settings):
+def check_sudden_disconnection(current, previous_temps, ch, alerts):
     """
     Check for sudden sensor disconnection (was valid, now invalid).
     If previous was good but current is None/invalid, alert. Non-programmer: Like a light that was on suddenly going out—check the bulb.
@@ -1321,26 +1741,23 @@ def check_sudden_disconnection(current, previous_temps, ch, alerts, settings):
         previous_temps (list): Previous.
         ch (int): Channel.
         alerts (list): Alerts.
-        settings (dict): Event log.
     
     Returns:
         None
     """
     previous = previous_temps[ch-1]
-    # Type safety.
-    if not isinstance(previous, (int, float, type(None))) or not isinstance(current, (int, float, type(None))):
-        logging.warning(f"Type error in check_sudden_disconnection for ch {ch}: current={type(current)} {current}, previous={type(previous)} {previous}")
-        return
+    # Type safety. Development aid only: skipped under python -O.
+    if __debug__:
+        if not isinstance(previous, (int, float, type(None))) or not isinstance(current, (int, float, type(None))):
+            logging.warning("Type error in check_sudden_disconnection for ch %s: current=%s %s, previous=%s %s", ch, type(current), current, type(previous), previous)
+            return
     # Check transition to invalid.
     if previous is not None and current is None:
-        bank = get_bank_for_channel(ch)
-        bat_id, local_ch = get_battery_and_local_ch(ch)
-        alert = f"Battery {bat_id} Bank {bank} Local Ch {local_ch}: Sudden disconnection."
+        prefix = CHANNEL_ALERT_PREFIX[ch]
+        alert = f"{prefix}: Sudden disconnection."
         alerts.append(alert)
-        event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-        if len(event_log) > settings.get('EventLogSize', 20):
-            event_log.pop(0)
-        logging.warning(f"Sudden disconnection alert on Battery {bat_id} Bank {bank} Local Ch {local_ch}.")
+        event_log.append(f"{poll_time_str}: {alert}")
+        logging.warning("Sudden disconnection alert on %s.", prefix)
 
 def choose_channel(channel, multiplexer_address):
     """
@@ -1357,13 +1774,13 @@ def choose_channel(channel, multiplexer_address):
         None
     """
     # Log for debug.
-    logging.debug(f"Switching to I2C channel {channel}.")
+    logging.debug("Switching to I2C channel %s.", channel)
     if bus:
         try:
-            # Write byte: 1 shifted left by channel number (bitmask).
-            bus.write_byte(multiplexer_address, 1 << channel)
+            # Write byte: the channel's bitmask (1 shifted left by channel number, precomputed).
+            bus.write_byte(multiplexer_address, MUX_CHANNEL_MASKS[channel])
         except IOError as e:
-            logging.error(f"I2C error selecting channel {channel}: {str(e)}")
+            logging.error("I2C error selecting channel %s: %s", channel, e)
 
 def setup_voltage_meter(settings):
     """
@@ -1388,19 +1805,22 @@ def setup_voltage_meter(settings):
             # Write to config register.
             bus.write_word_data(settings['VoltageMeterAddress'], settings['ConfigRegister'], config_value)
         except IOError as e:
-            logging.error(f"I2C error configuring voltage meter: {str(e)}")
+            logging.error("I2C error configuring voltage meter: %s", e)
 
-def read_voltage_with_retry(bank_id, settings):
+def read_voltage_with_retry(bank_id, settings, skip_if_resting=False):
     """
     Read voltage from a specific bank with retries and averaging.
     Selects I2C channel for the bank, configures ADC, reads raw ADC value twice, averages valid readings (filters outliers >5% diff).
     Converts raw to voltage using formula and calibration. Retries whole process up to 2 times on failure.
+    After VOLTAGE_FAIL_LIMIT failed reads in a row the bank is rested: the next VOLTAGE_FAIL_SKIP main-poll reads
+    (skip_if_resting=True) are skipped, then it is retried. Other callers such as balancing always read for real.
     Updates alive_timestamp during reads for watchdog. Non-programmer: Like measuring battery level with a multimeter,
     taking multiple samples and averaging to be sure.
     
     Args:
         bank_id (int): Bank number (1 to num_series_banks).
         settings (dict): Config for calibration, ratios, etc.
+        skip_if_resting (bool): Answer "no reading" straight away while the bank is rested (main poll only).
     
     Returns:
         tuple: (average_voltage float or None, list of valid readings, list of valid raw ADC)
@@ -1408,53 +1828,56 @@ def read_voltage_with_retry(bank_id, settings):
     # Global: Update timestamp.
     global alive_timestamp
     # Log start.
-    logging.info(f"Starting voltage read for Bank {bank_id}.")
+    logging.info("Starting voltage read for Bank %s.", bank_id)
     # Validate bank_id.
     if bank_id > settings['num_series_banks']:
-        logging.warning(f"Bank {bank_id} exceeds configured num_series_banks ({settings['num_series_banks']}). Cannot read voltage.")
+        logging.warning("Bank %s exceeds configured num_series_banks (%s). Cannot read voltage.", bank_id, settings['num_series_banks'])
+        return None, [], []
+    # A bank that keeps failing (e.g., loose sense wire) is rested: skip a few reads, then try once more.
+    if skip_if_resting and voltage_skip_left.get(bank_id, 0) > 0:
+        voltage_skip_left[bank_id] -= 1
+        logging.debug("Bank %s keeps failing - skipping this read.", bank_id)
         return None, [], []
     # Get scaling and calibration.
     voltage_divider_ratio = settings['VoltageDividerRatio']
     sensor_id = bank_id
     calibration_factor = settings[f'Sensor{sensor_id}_Calibration']
+    # Look up the ADC address/register and the bus read method once, not again for every sample.
+    meter_address = settings["VoltageMeterAddress"]
+    conversion_register = settings["ConversionRegister"]
+    read_block = bus.read_i2c_block_data if bus else None
     # Retry up to 2 times.
     for attempt in range(2):
-        # Update timestamp.
-        alive_timestamp = time.time()
-        logging.debug(f"Voltage read attempt {attempt+1} for Bank {bank_id}.")
+        # Update timestamp - once per attempt is enough, an attempt takes a fraction of a second.
+        alive_timestamp = time.monotonic()
+        logging.debug("Voltage read attempt %s for Bank %s.", attempt+1, bank_id)
         # Lists for readings.
         readings = []
         raw_values = []
+        # Channel = bank-1 (0-based).
+        meter_channel = bank_id - 1 # Direct mapping: Bank 1 = Channel 0, Bank 2 = Channel 1, etc.
+        # Select channel on mux and configure the ADC once per attempt - nothing else touches the bus between
+        # the two samples, so repeating these writes for the second sample would change nothing.
+        choose_channel(meter_channel, settings['MultiplexerAddress'])
+        setup_voltage_meter(settings)
         # Take 2 samples.
         for _ in range(2):
-            # Update timestamp.
-            alive_timestamp = time.time()
-            # Channel = bank-1 (0-based).
-            meter_channel = bank_id - 1 # Direct mapping: Bank 1 = Channel 0, Bank 2 = Channel 1, etc.
-            # Select channel on mux.
-            choose_channel(meter_channel, settings['MultiplexerAddress'])
-            # Configure ADC.
-            setup_voltage_meter(settings)
             if bus:
                 try:
-                    # Start conversion (write 0x01?).
-                    bus.write_byte(settings['VoltageMeterAddress'], 0x01)
-                    # Short delay for conversion.
+                    # Short delay for conversion. (The ADC runs continuously, so no start command is needed - the
+                    # register read below points the chip at the conversion register itself.)
                     time.sleep(0.05)
-                    # Update timestamp.
-                    alive_timestamp = time.time()
-                    # Read 16-bit word from conversion reg (ADS1115 returns big-endian, need to convert to little-endian).
-                    raw_adc = bus.read_word_data(settings["VoltageMeterAddress"], settings["ConversionRegister"])
-                    # Convert from big-endian to little-endian by swapping bytes.
-                    raw_adc = ((raw_adc & 0xFF) << 8) | ((raw_adc >> 8) & 0xFF)
+                    # Read the 2-byte conversion register in one block read; the ADS1115 sends a signed value, high byte first.
+                    data = read_block(meter_address, conversion_register, 2)
+                    raw_adc = struct.unpack('>h', bytes(data))[0]
                 except IOError as e:
-                    logging.error(f"I2C error in voltage read for Bank {bank_id}: {str(e)}")
+                    logging.error("I2C error in voltage read for Bank %s: %s", bank_id, e)
                     raw_adc = 0
             else:
                 # Test mode: Fake value.
                 raw_adc = 16000 + bank_id * 100
             # Log raw.
-            logging.debug(f"Raw ADC for Bank {bank_id} (Sensor {sensor_id}): {raw_adc}")
+            logging.debug("Raw ADC for Bank %s (Sensor %s): %s", bank_id, sensor_id, raw_adc)
             # Convert if non-zero.
             if raw_adc != 0:
                 # ADS1115 formula: Raw * (full scale / 32767), full scale 6.144V for gain.
@@ -1470,17 +1893,29 @@ def read_voltage_with_retry(bank_id, settings):
         # If readings, average.
         if readings:
             average = sum(readings) / len(readings)
-            # Filter valid: Within 5% of average.
-            valid_readings = [r for r in readings if abs(r - average) / (average if average != 0 else 1) <= 0.05]
-            valid_adc = [raw_values[i] for i, r in enumerate(readings) if abs(r - average) / (average if average != 0 else 1) <= 0.05]
+            # Filter valid: Within 5% of average - one pass keeps each reading with its raw ADC value and sums as it goes.
+            # abs(): the signed ADC can read slightly below 0V, and a negative limit would reject every sample.
+            limit = 0.05 * abs(average) if average else 0.05
+            valid_readings = []
+            valid_adc = []
+            valid_total = 0.0
+            for r, adc in zip(readings, raw_values):
+                if abs(r - average) <= limit:
+                    valid_readings.append(r)
+                    valid_adc.append(adc)
+                    valid_total += r
             if valid_readings:
                 # Success—average valids.
-                logging.info(f"Voltage read successful for Bank {bank_id}: {average:.2f}V.")
-                return sum(valid_readings) / len(valid_readings), valid_readings, valid_adc
+                logging.info("Voltage read successful for Bank %s: %.2fV.", bank_id, average)
+                voltage_fail_count[bank_id] = 0
+                return valid_total / len(valid_readings), valid_readings, valid_adc
         # Inconsistent—retry.
-        logging.debug(f"Readings for Bank {bank_id} inconsistent, retrying.")
+        logging.debug("Readings for Bank %s inconsistent, retrying.", bank_id)
     # All retries failed.
-    logging.error(f"Couldn't get good voltage reading for Bank {bank_id} after 2 tries.")
+    logging.error("Couldn't get good voltage reading for Bank %s after 2 tries.", bank_id)
+    voltage_fail_count[bank_id] = voltage_fail_count.get(bank_id, 0) + 1
+    if voltage_fail_count[bank_id] >= VOLTAGE_FAIL_LIMIT:
+        voltage_skip_left[bank_id] = VOLTAGE_FAIL_SKIP
     return None, [], []
 
 def set_relay_connection(high, low, settings):
@@ -1492,7 +1927,7 @@ def set_relay_connection(high, low, settings):
     Args:
         high (int): Source bank (higher voltage), or 0 for reset.
         low (int): Destination bank, or 0 for reset.
-        settings (dict): Config with relay_mapping and Relay{i}_Pin.
+        settings (dict): Config with relay_mapping and the relay_pin_list/relay_pair_pins tables.
     
     Returns:
         None
@@ -1501,44 +1936,40 @@ def set_relay_connection(high, low, settings):
         # Validate banks unless reset.
         if high != 0 and low != 0:
             if high > settings['num_series_banks'] or low > settings['num_series_banks']:
-                logging.warning(f"Bank {high} or {low} exceeds configured num_series_banks ({settings['num_series_banks']}). Cannot balance.")
+                logging.warning("Bank %s or %s exceeds configured num_series_banks (%s). Cannot balance.", high, low, settings['num_series_banks'])
                 return
-            logging.info(f"Attempting to set GPIO relays for connection from Bank {high} to {low}")
+            logging.info("Attempting to set GPIO relays for connection from Bank %s to %s", high, low)
         else:
             logging.info("Resetting all GPIO relays to off")
         
+        # Pin tables precomputed in load_config (all 4 relay pins, and the pins each pair switches on).
+        relay_pin_list = settings['relay_pin_list']
         # Reset: Set all relay pins LOW
         if high == 0 and low == 0:
-            for i in range(4):  # Assuming 4 relays
-                pin = settings[f'Relay{i}_Pin']
+            for pin in relay_pin_list:
                 GPIO.output(pin, GPIO.LOW)
             logging.info("All relays deactivated")
             return
         
         # Key for mapping (e.g., '1-2')
         pair_key = f"{high}-{low}"
-        if pair_key in settings.get('relay_mapping', {}):
-            relays = settings['relay_mapping'][pair_key]
-            logging.debug(f"Activating relays {relays} for {pair_key}")
+        pair_pins = settings['relay_pair_pins'].get(pair_key)
+        if pair_pins is not None:
+            logging.debug("Activating relays %s for %s", settings['relay_mapping'][pair_key], pair_key)
             # First, deactivate all relays to ensure clean state
-            for i in range(4):
-                pin = settings[f'Relay{i}_Pin']
+            for pin in relay_pin_list:
                 GPIO.output(pin, GPIO.LOW)
-            # Activate specific relays
-            for relay in relays:
-                if 0 <= relay < 4:  # Validate relay index
-                    pin = settings[f'Relay{relay}_Pin']
-                    GPIO.output(pin, GPIO.HIGH)
-                    logging.debug(f"Relay {relay} on pin {pin} activated")
-                else:
-                    logging.warning(f"Invalid relay index {relay} for {pair_key}")
+            # Activate specific relays (invalid relay indices were already dropped and warned about at load time).
+            for pin in pair_pins:
+                GPIO.output(pin, GPIO.HIGH)
+                logging.debug("Relay pin %s activated", pin)
         else:
-            logging.warning(f"No relay mapping found for {pair_key}. Cannot balance.")
+            logging.warning("No relay mapping found for %s. Cannot balance.", pair_key)
             return
         
-        logging.info(f"GPIO relay setup completed for balancing from Bank {high} to {low}")
+        logging.info("GPIO relay setup completed for balancing from Bank %s to %s", high, low)
     except Exception as e:
-        logging.error(f"Error in set_relay_connection: {e}")
+        logging.error("Error in set_relay_connection: %s", e)
 
 def control_dcdc_converter(turn_on, settings):
     """
@@ -1557,14 +1988,74 @@ def control_dcdc_converter(turn_on, settings):
             # Set pin high (on) or low (off).
             GPIO.output(settings['DC_DC_RelayPin'], GPIO.HIGH if turn_on else GPIO.LOW)
         # Log status.
-        logging.info(f"DC-DC Converter is now {'on' if turn_on else 'off'}")
+        logging.info("DC-DC Converter is now %s", 'on' if turn_on else 'off')
     except Exception as e:
-        logging.error(f"Problem controlling DC-DC converter: {e}")
+        logging.error("Problem controlling DC-DC converter: %s", e)
+
+def smtp_connect(settings):
+    """
+    Open and log in to an SMTP connection for alert emails.
+
+    Args:
+        settings (dict): SMTP config.
+
+    Returns:
+        smtplib.SMTP: Connected, TLS-enabled (and logged in, if credentials are set) server connection.
+    """
+    # Connect to SMTP server.
+    server = smtplib.SMTP(settings['SMTP_Server'], settings['SMTP_Port'], timeout=30)
+    # Enable TLS encryption.
+    server.starttls()
+    # Login if credentials provided.
+    if settings['SMTP_Username'] and settings['SMTP_Password']:
+        server.login(settings['SMTP_Username'], settings['SMTP_Password'])
+    return server
+
+def email_worker(settings):
+    """
+    Background thread: send alert emails from email_queue one by one.
+    Sending can take seconds (connect, TLS, login), so doing it here keeps the main loop (sensor reads, watchdog) moving.
+    Keeps the SMTP connection open between emails and reconnects if the server has dropped it.
+    Non-programmer: Like handing letters to a mail clerk so you can get back to work instead of queueing at the post office.
+
+    Args:
+        settings (dict): SMTP config.
+    """
+    global last_email_time
+    server = None
+    while True:
+        msg, message = email_queue.get()
+        try:
+            # Two tries: the kept-open connection may have been closed by the server while idle.
+            for attempt in range(2):
+                try:
+                    if server is None:
+                        server = smtp_connect(settings)
+                    server.send_message(msg)
+                    break
+                except (smtplib.SMTPServerDisconnected, OSError):
+                    server = None
+                    if attempt == 1:
+                        raise
+            logging.info("Alert email sent: %s", message)
+        except Exception as e:
+            logging.error("Failed to send alert email: %s", e)
+            # Allow the next alert to try again instead of waiting out the throttle interval.
+            last_email_time = None
+            if server is not None:
+                try:
+                    server.close()
+                except Exception:
+                    pass
+                server = None
+        finally:
+            email_queue.task_done()
 
 def send_alert_email(message, settings):
     """
-    Send an email alert if enough time has passed since last one (throttled).
-    Builds MIME message, connects to SMTP, logs in, sends. Non-programmer: Like texting an alert but with spam control.
+    Queue an email alert if enough time has passed since last one (throttled).
+    Builds MIME message and hands it to the background email_worker thread, so the caller never waits on the mail server.
+    Non-programmer: Like texting an alert but with spam control.
     
     Args:
         message (str): Alert text body.
@@ -1574,30 +2065,49 @@ def send_alert_email(message, settings):
         None
     """
     # Global: Check throttle.
-    global last_email_time
-    if time.time() - last_email_time < settings['EmailAlertIntervalSeconds']:
+    global last_email_time, email_thread
+    # Monotonic clock: a wall-clock jump (NTP sync at boot, manual date change) can't block or release alerts early.
+    if last_email_time is not None and time.monotonic() - last_email_time < settings['EmailAlertIntervalSeconds']:
         logging.debug("Skipping alert email to avoid flooding.")
         return
+    # Create text message.
+    msg = MIMEText(message)
+    msg['Subject'] = "Battery Monitor Alert"
+    msg['From'] = settings['SenderEmail']
+    msg['To'] = settings['RecipientEmail']
+    # Start the sender thread on first use.
+    if email_thread is None:
+        email_thread = threading.Thread(target=email_worker, args=(settings,), daemon=True, name='email-sender')
+        email_thread.start()
     try:
-        # Create text message.
-        msg = MIMEText(message)
-        msg['Subject'] = "Battery Monitor Alert"
-        msg['From'] = settings['SenderEmail']
-        msg['To'] = settings['RecipientEmail']
-        # Connect to SMTP server.
-        with smtplib.SMTP(settings['SMTP_Server'], settings['SMTP_Port']) as server:
-            # Enable TLS encryption.
-            server.starttls()
-            # Login if credentials provided.
-            if settings['SMTP_Username'] and settings['SMTP_Password']:
-                server.login(settings['SMTP_Username'], settings['SMTP_Password'])
-            # Send the message.
-            server.send_message(msg)
-        # Update timer.
-        last_email_time = time.time()
-        logging.info(f"Alert email sent: {message}")
-    except Exception as e:
-        logging.error(f"Failed to send alert email: {e}")
+        email_queue.put_nowait((msg, message))  # Never block the monitoring loop on a full outbox.
+    except queue.Full:
+        # Leave the timer alone: a dropped alert shouldn't hold back the next one.
+        logging.warning("Alert email queue full (mail server unreachable?) - dropping alert email.")
+        return
+    # Update timer once queued, so the alerts that follow in the next polls don't pile up in the queue.
+    last_email_time = time.monotonic()
+    logging.debug("Alert email queued.")
+
+def set_alarm_relay(on, settings):
+    """
+    Switch the alarm relay (buzzer/light) on or off, skipping the GPIO write if it is already in that state.
+    Non-programmer: Like only flipping the alarm switch when it actually needs to change.
+
+    Args:
+        on (bool): True for alarm on.
+        settings (dict): GPIO pin for the alarm relay.
+
+    Returns:
+        bool: True if the relay state changed.
+    """
+    global alarm_relay_on
+    if on == alarm_relay_on:
+        return False
+    if GPIO:
+        GPIO.output(settings['AlarmRelayPin'], GPIO.HIGH if on else GPIO.LOW)
+    alarm_relay_on = on
+    return True
 
 def check_for_issues(voltages, temps_alerts, settings):
     """
@@ -1633,28 +2143,22 @@ def check_for_issues(voltages, temps_alerts, settings):
             # Zero/None: Disconnected or error.
             alert = f"Bank {i}: Zero voltage."
             alerts.append(alert)
-            event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-            if len(event_log) > settings.get('EventLogSize', 20):
-                event_log.pop(0)
-            logging.warning(f"Zero voltage alert on Bank {i}.")
+            event_log.append(f"{poll_time_str}: {alert}")
+            logging.warning("Zero voltage alert on Bank %s.", i)
             alert_needed = True
         elif v > settings['HighVoltageThresholdPerBattery']:
             # Overvoltage.
             alert = f"Bank {i}: High voltage ({v:.2f}V)."
             alerts.append(alert)
-            event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-            if len(event_log) > settings.get('EventLogSize', 20):
-                event_log.pop(0)
-            logging.warning(f"High voltage alert on Bank {i}: {v:.2f}V.")
+            event_log.append(f"{poll_time_str}: {alert}")
+            logging.warning("High voltage alert on Bank %s: %.2fV.", i, v)
             alert_needed = True
         elif v < settings['LowVoltageThresholdPerBattery']:
             # Undervoltage.
             alert = f"Bank {i}: Low voltage ({v:.2f}V)."
             alerts.append(alert)
-            event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-            if len(event_log) > settings.get('EventLogSize', 20):
-                event_log.pop(0)
-            logging.warning(f"Low voltage alert on Bank {i}: {v:.2f}V.")
+            event_log.append(f"{poll_time_str}: {alert}")
+            logging.warning("Low voltage alert on Bank %s: %.2fV.", i, v)
             alert_needed = True
     # Add temp alerts.
     if temps_alerts:
@@ -1662,15 +2166,13 @@ def check_for_issues(voltages, temps_alerts, settings):
         alert_needed = True
     # If alerts needed, activate hardware alarm and send email.
     if alert_needed:
-        if GPIO:
-            GPIO.output(settings['AlarmRelayPin'], GPIO.HIGH)  # Turn on buzzer/light.
-        logging.info("Alarm relay activated.")
+        if set_alarm_relay(True, settings):  # Turn on buzzer/light.
+            logging.info("Alarm relay activated.")
         send_alert_email("\n".join(alerts), settings)
     else:
         # No issues—deactivate alarm.
-        if GPIO:
-            GPIO.output(settings['AlarmRelayPin'], GPIO.LOW)
-        logging.info("No issues; alarm relay deactivated.")
+        if set_alarm_relay(False, settings):
+            logging.info("No issues; alarm relay deactivated.")
     # Return status and full alerts.
     return alert_needed, alerts
 
@@ -1709,20 +2211,18 @@ def balance_battery_voltages(stdscr, high, low, settings, temps_alerts, is_heati
     # Log start.
     logging.info(f"Starting {mode} balance from Bank {high} to {low}.")
     # Log event.
-    event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {mode} balancing started from Bank {high} to {low}")
-    if len(event_log) > settings.get('EventLogSize', 20):
-        event_log.pop(0)
+    event_log.append(f"{event_time_str()}: {mode} balancing started from Bank {high} to {low}")
     # Set flags.
     balancing_active = True
-    web_data['balancing'] = True
+    publish_web_data(balancing=True)
     # Read initial voltages.
     initial_high_v, _, _ = read_voltage_with_retry(high, settings)
     initial_low_v, _, _ = read_voltage_with_retry(low, settings)
-    # Skip if low is zero.
-    if initial_low_v == 0.0:
-        logging.warning(f"Cannot balance to Bank {low} (0.00V). Skipping.")
+    # Skip if either bank has no reading (None) or reads zero - balancing blind could run the converter for nothing.
+    if not initial_low_v or not initial_high_v:
+        logging.warning(f"Cannot balance from Bank {high} to {low} (no valid voltage reading: {initial_high_v}, {initial_low_v}). Skipping.")
         balancing_active = False
-        web_data['balancing'] = False
+        publish_web_data(balancing=False)
         return
     # Set relays.
     set_relay_connection(high, low, settings)
@@ -1744,23 +2244,29 @@ def balance_battery_voltages(stdscr, high, low, settings, temps_alerts, is_heati
     low_trend = [voltage_low]
     # Read interval during balance (reuse startup).
     read_interval = settings['test_read_interval'] # Reuse from startup
-    last_read = time.time()
+    # Read voltages periodically on a helper thread, so slow I2C reads/retries don't freeze the progress display.
+    # It hands (high, low) pairs over through a small queue that the loop below empties each frame.
+    voltage_samples = deque(maxlen=32)
+    stop_sampling = threading.Event()
+    def sample_voltages():
+        while not stop_sampling.wait(read_interval):
+            voltage_samples.append((read_voltage_with_retry(high, settings)[0], read_voltage_with_retry(low, settings)[0]))
+    sampler = threading.Thread(target=sample_voltages, daemon=True, name='balance-sampler')
+    sampler.start()
     # Loop for duration.
     while time.time() - balance_start_time < settings['BalanceDurationSeconds']:
         # Update timestamp.
-        alive_timestamp = time.time()
+        alive_timestamp = time.monotonic()
         # Progress calc.
         elapsed = time.time() - balance_start_time
         progress = min(1.0, elapsed / settings['BalanceDurationSeconds'])
-        # Read voltages periodically.
-        if time.time() - last_read >= read_interval:
-            new_high, _, _ = read_voltage_with_retry(high, settings)
-            new_low, _, _ = read_voltage_with_retry(low, settings)
+        # Take any new voltage readings from the sampler thread.
+        while voltage_samples:
+            new_high, new_low = voltage_samples.popleft()
             voltage_high = new_high if new_high is not None else voltage_high
             voltage_low = new_low if new_low is not None else voltage_low
             high_trend.append(voltage_high)
             low_trend.append(voltage_low)
-            last_read = time.time()
         # Progress bar.
         bar_length = 20
         filled = int(bar_length * progress)
@@ -1781,8 +2287,13 @@ def balance_battery_voltages(stdscr, high, low, settings, temps_alerts, is_heati
         # Log progress.
         logging.debug(f"Balancing progress: {progress * 100:.2f}%, High: {voltage_high:.2f}V, Low: {voltage_low:.2f}V")
         frame_index += 1
-        # Short sleep for animation.
-        time.sleep(0.01)
+        # Sleep until the next spinner frame or the end of balancing, whichever comes first
+        # (was a fixed 10ms, i.e. 100 redraws a second). New readings are picked up on the next frame.
+        time.sleep(max(0.0, min(BALANCE_FRAME_SECONDS,
+                                balance_start_time + settings['BalanceDurationSeconds'] - time.time())))
+    # Stop the sampler and wait for any read in progress, so it can't share the I2C bus with the final reads.
+    stop_sampling.set()
+    sampler.join()
     # Final reads.
     final_high_v, _, _ = read_voltage_with_retry(high, settings)
     final_low_v, _, _ = read_voltage_with_retry(low, settings)
@@ -1798,7 +2309,7 @@ def balance_battery_voltages(stdscr, high, low, settings, temps_alerts, is_heati
     logging.info("Resetting relay connections to default state.")
     # Reset flags.
     balancing_active = False
-    web_data['balancing'] = False
+    publish_web_data(balancing=False)
     last_balance_time = time.time()
     # Verify: Check changes.
     if len(high_trend) >= 3 and len(low_trend) >= 3:
@@ -1809,9 +2320,7 @@ def balance_battery_voltages(stdscr, high, low, settings, temps_alerts, is_heati
         if high_change >= 0 or low_change <= 0 or abs(high_change) < min_delta or low_change < min_delta:
             alert = f"Balancing failed from Bank {high} to {low}: No voltage change detected (High change: {high_change:.3f}V, Low change: {low_change:.3f}V). Possible relay failure."
             temps_alerts.append(alert) # Add to alerts (will trigger check_for_issues)
-            event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-            if len(event_log) > settings.get('EventLogSize', 20):
-                event_log.pop(0)
+            event_log.append(f"{event_time_str()}: {alert}")
             logging.error(alert)
             balancer_failed = True
         else:
@@ -1820,9 +2329,7 @@ def balance_battery_voltages(stdscr, high, low, settings, temps_alerts, is_heati
         logging.warning(f"Insufficient readings for balancing verification from {high} to {low}.")
     # Log end.
     logging.info(f"{mode} balancing process completed.")
-    event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {mode} balancing completed from Bank {high} to {low}")
-    if len(event_log) > settings.get('EventLogSize', 20):
-        event_log.pop(0)
+    event_log.append(f"{event_time_str()}: {mode} balancing completed from Bank {high} to {low}")
 
 def compute_bank_medians(calibrated_temps, valid_min):
     """
@@ -1837,6 +2344,20 @@ def compute_bank_medians(calibrated_temps, valid_min):
     Returns:
         list: Dict per bank with 'median', 'min', 'max', 'invalid' counts.
     """
+    # Fast path: all banks at once with NumPy (None becomes NaN, which the nan* functions skip).
+    if BANK_INDEX_ARRAY is not None:
+        temps = np.array(calibrated_temps, dtype=float)[BANK_INDEX_ARRAY]
+        valid_counts = (~np.isnan(temps)).sum(axis=1)
+        # A bank with no valid sensors makes NumPy warn; those banks are reported as zeros below anyway.
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore', RuntimeWarning)
+            meds = np.nanmedian(temps, axis=1)
+            mins = np.nanmin(temps, axis=1)
+            maxs = np.nanmax(temps, axis=1)
+        sensors_in_bank = BANK_INDEX_ARRAY.shape[1]
+        return [{'median': float(meds[b]), 'min': float(mins[b]), 'max': float(maxs[b]), 'invalid': int(sensors_in_bank - valid_counts[b])}
+                if valid_counts[b] else {'median': 0.0, 'min': 0.0, 'max': 0.0, 'invalid': sensors_in_bank}
+                for b in range(len(valid_counts))]
     # List for bank stats.
     bank_stats = []
     # For each bank.
@@ -1862,11 +2383,53 @@ def compute_bank_medians(calibrated_temps, valid_min):
         bank_stats.append({'median': med, 'min': mn, 'max': mx, 'invalid': invalid_count})
     return bank_stats
 
+def flag_temperature_anomalies(calibrated_temps, previous_temps, bank_medians, previous_bank_medians, cfg):
+    """
+    Find which channels could trigger a temperature alert this poll, checking all channels at once with NumPy.
+    The per-channel check_* functions still build the alert messages; this just lets the main loop visit only the
+    channels that need them, so a quiet poll costs a few array operations instead of a Python call per channel.
+    Uses the same comparisons as the check_* functions, so the same alerts fire.
+    Non-programmer: Like scanning a class photo for anyone not smiling, then only talking to those people.
+
+    Args:
+        calibrated_temps (list): Current temps (None for invalid).
+        previous_temps (list or None): Temps from the last poll (None for invalid), or None on the first poll.
+        bank_medians (list): Current median per bank.
+        previous_bank_medians (list or None): Medians from the last poll.
+        cfg (LoopConfig): Thresholds.
+
+    Returns:
+        tuple: (static_channels, dynamic_channels) - lists of 0-based channel indices to check, or (None, None) without NumPy.
+            static_channels covers invalid/high/low/deviation, dynamic_channels covers rise/lag/sudden disconnection.
+    """
+    if CHANNEL_BANK_ARRAY is None:
+        return None, None
+    temps = np.array(calibrated_temps, dtype=float)
+    medians = np.array(bank_medians, dtype=float)[CHANNEL_BANK_ARRAY]
+    # Static checks. Invalid readings (None -> NaN) are picked up for the invalid-reading alert;
+    # NaN compares False everywhere else, so they never trip the threshold checks.
+    invalid = np.isnan(temps)
+    abs_dev = np.abs(temps - medians)
+    abs_medians = np.abs(medians)
+    rel_dev = np.divide(abs_dev, abs_medians, out=np.zeros_like(abs_dev), where=abs_medians != 0)
+    static = invalid | (temps > cfg.high_threshold) | (temps < cfg.low_threshold) | \
+             (abs_dev > cfg.abs_deviation_threshold) | (rel_dev > cfg.deviation_threshold)
+    # Dynamic checks need last poll's values.
+    if not previous_temps or previous_bank_medians is None:
+        return np.flatnonzero(static).tolist(), []
+    previous = np.array(previous_temps, dtype=float)
+    rise = temps - previous
+    bank_rise = (np.array(bank_medians, dtype=float) - np.array(previous_bank_medians, dtype=float))[CHANNEL_BANK_ARRAY]
+    dynamic = (rise > cfg.rise_threshold) | (np.abs(rise - bank_rise) > cfg.disconnection_lag_threshold) | \
+              (~np.isnan(previous) & invalid)
+    return np.flatnonzero(static).tolist(), np.flatnonzero(dynamic).tolist()
+
 def fetch_rrd_history(settings):
     """
     Fetch historical data from RRD database for charts.
-    Uses rrdtool xport to get last HISTORY_LIMIT points (60s steps) for medtemp and each volt bank.
-    Parses XML output into list of dicts with time and values (None for NaN). Non-programmer: Like pulling recent log entries
+    Uses the native rrdtool binding's fetch when available, otherwise the same fetch through the "rrdtool -" pipe, to get last
+    HISTORY_LIMIT points (60s steps) for medtemp and each volt bank, as a list of dicts with time and values (None for NaN).
+    Non-programmer: Like pulling recent log entries
     from a journal for a trend graph.
     
     Args:
@@ -1877,68 +2440,64 @@ def fetch_rrd_history(settings):
     """
     # Start time: Now minus limit * 60s.
     start = int(time.time()) - (HISTORY_LIMIT * 60)
+    # Use the native binding when installed: no extra process and no XML to parse.
+    if rrdtool is not None:
+        try:
+            # Fetch the LAST archive at 60s resolution; values come back as Python floats (None for unknown).
+            (fetch_start, _, fetch_step), ds_names, rows = rrdtool.fetch(*rrd_daemon_args(), RRD_FILE, 'LAST', '--start', str(start), '--end', 'now', '--resolution', '60')
+            # Column position of each data source, so the order they were created in doesn't matter.
+            columns = [ds_names.index('medtemp')] + [ds_names.index(f'volt{i}') for i in range(1, settings['num_series_banks'] + 1)]
+            data = []
+            # Each row covers the step ending at its timestamp, so the first row is at fetch_start + fetch_step.
+            current_time = fetch_start + fetch_step
+            for row in rows:
+                row_data = {'time': current_time, 'medtemp': row[columns[0]]}
+                for i in range(settings['num_series_banks']):
+                    row_data[f'volt{i+1}'] = row[columns[i+1]]
+                data.append(row_data)
+                current_time += fetch_step
+            logging.debug(f"Fetched {len(data)} history entries from RRD.")
+            # Reverse for newest first.
+            return data[::-1]
+        except Exception as e:
+            logging.error(f"RRD fetch failed: {e}")
+            return []
     try:
-        # Build DEF lines for each DS.
-        def_list = [f'DEF:mt={RRD_FILE}:medtemp:LAST']
-        xport_list = ['XPORT:mt:MedianTemp']
-        for i in range(1, settings['num_series_banks'] + 1):
-            def_list.append(f'DEF:v{i}={RRD_FILE}:volt{i}:LAST')
-            xport_list.append(f'XPORT:v{i}:Bank{i}')
-        # Run xport command.
-        output = subprocess.check_output(['rrdtool', 'xport',
-                                          '--start', str(start),
-                                          '--end', 'now',
-                                          '--step', '60'] + def_list + xport_list)
-        # Log raw for debug.
-        logging.debug(f"Raw RRD xport output: {output.decode()}")
-        # Parse XML.
-        root = ET.fromstring(output.decode())
-        # Get meta if present.
-        meta = root.find('meta')
-        if meta is not None:
-            meta_start = int(meta.find('start').text) if meta.find('start') is not None else start
-            meta_step = int(meta.find('step').text) if meta.find('step') is not None else 60
-        else:
-            meta_start = start
-            meta_step = 60
-        # List for data.
+        # No binding: run the same fetch through the long-running "rrdtool -" process (no new process, no XML).
+        # Its output is a header line with the data source names, a blank line, then one "timestamp: value value ..."
+        # line per step, with "nan" for unknown values.
+        lines = rrd_pipe_command(['fetch', RRD_FILE, 'LAST', '--start', str(start), '--end', 'now', '--resolution', '60'] + rrd_daemon_args())
+        ds_names = lines[0].split() if lines else []
+        # Column position of each data source, so the order they were created in doesn't matter.
+        columns = [ds_names.index('medtemp')] + [ds_names.index(f'volt{i}') for i in range(1, settings['num_series_banks'] + 1)]
         data = []
-        current_time = meta_start
-        # Expected values per row: medtemp + banks.
-        expected_vs = settings['num_series_banks'] + 1 # medtemp + volts
-        # Process each row.
-        for row in root.findall('.//row'):
+        for line in lines[1:]:
+            stamp, sep, values = line.partition(':')
+            if not sep:
+                continue  # The blank line after the header.
             vs = []
-            # Parse each <v> element.
-            for v in row.findall('v'):
-                if v.text is None:
-                    vs.append(None)
-                    continue
+            for v in values.split():
                 try:
                     # NaN to None.
-                    vs.append(float(v.text) if v.text != 'NaN' else None)
+                    value = float(v)
+                    vs.append(value if value == value else None)
                 except ValueError:
                     vs.append(None)
             # Skip incomplete rows.
-            if len(vs) != expected_vs:
-                logging.warning(f"Skipping RRD row with incomplete values (got {len(vs)}, expected {expected_vs}).")
+            if len(vs) != len(ds_names):
+                logging.warning(f"Skipping RRD row with incomplete values (got {len(vs)}, expected {len(ds_names)}).")
                 continue
             # Build row dict.
-            row_data = {'time': current_time, 'medtemp': vs[0]}
+            row_data = {'time': int(stamp), 'medtemp': vs[columns[0]]}
             for i in range(settings['num_series_banks']):
-                row_data[f'volt{i+1}'] = vs[i+1]
+                row_data[f'volt{i+1}'] = vs[columns[i+1]]
             data.append(row_data)
-            # Next timestamp.
-            current_time += meta_step
         # Log count.
         logging.debug(f"Fetched {len(data)} history entries from RRD.")
         # Reverse for newest first.
         return data[::-1]
     except subprocess.CalledProcessError as e:
-        logging.error(f"RRD xport failed: {e}")
-        return []
-    except ET.ParseError as e:
-        logging.error(f"RRD XML parse error: {e}. Output was: {output.decode()}")
+        logging.error(f"RRD fetch failed: {e}")
         return []
     except FileNotFoundError:
         logging.error("rrdtool not found for fetch. Install rrdtool.")
@@ -1947,6 +2506,219 @@ def fetch_rrd_history(settings):
         logging.error(f"Unexpected error in fetch_rrd_history: {e}\n{traceback.format_exc()}")
         return []
 
+def rrd_daemon_args():
+    """
+    Extra rrdtool arguments for talking to rrdcached, if one is configured.
+    rrdcached keeps updates in memory and writes them to disk in bulk, so each sample no longer costs a disk write.
+    Non-programmer: Like handing letters to a mail room that posts them in one batch, instead of walking each one to the post office.
+
+    Returns:
+        list: ['--daemon', address] when RRD_DAEMON is set, otherwise an empty list.
+    """
+    return ['--daemon', RRD_DAEMON] if RRD_DAEMON else []
+
+def rrd_pipe_command(args):
+    """
+    Run one rrdtool command through a single long-running "rrdtool -" process instead of starting a new rrdtool per call.
+    The process reads one command per line and answers with its output followed by an "OK ..." line (or one "ERROR: ..." line),
+    the same pipe mode Perl's RRDp uses. It's started on first use and restarted if it dies.
+    Non-programmer: Like keeping the database clerk at the counter all day instead of calling them in for every form.
+
+    Args:
+        args (list): Command and arguments, e.g. ['update', RRD_FILE, 'N:1:2'].
+
+    Returns:
+        list: Output lines before the "OK" line.
+
+    Raises:
+        subprocess.CalledProcessError: If rrdtool answers with ERROR.
+        FileNotFoundError: If the rrdtool program isn't installed.
+        OSError: If the pipe breaks (the process is dropped and restarted next call).
+    """
+    global rrd_pipe
+    # Pipe mode splits on spaces, so quote anything containing one (e.g. a path).
+    line = ' '.join(f'"{arg}"' if ' ' in arg else arg for arg in args) + '\n'
+    with rrd_pipe_lock:
+        if rrd_pipe is None or rrd_pipe.poll() is not None:
+            rrd_pipe = subprocess.Popen(['rrdtool', '-'], stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                        stderr=subprocess.DEVNULL, text=True, bufsize=1)
+        try:
+            rrd_pipe.stdin.write(line)
+            rrd_pipe.stdin.flush()
+            output = []
+            while True:
+                reply = rrd_pipe.stdout.readline()
+                if not reply:
+                    raise OSError("rrdtool pipe closed")
+                if reply.startswith('OK'):
+                    return output
+                if reply.startswith('ERROR'):
+                    raise subprocess.CalledProcessError(1, ['rrdtool'] + args, output=reply.strip())
+                output.append(reply.rstrip('\n'))
+        except OSError:
+            # Broken pipe or dead process: drop it so the next command starts a fresh one.
+            close_rrd_pipe_locked()
+            raise
+
+def close_rrd_pipe_locked():
+    """
+    Stop the "rrdtool -" process, if running. Caller must hold rrd_pipe_lock.
+    """
+    global rrd_pipe
+    if rrd_pipe is None:
+        return
+    try:
+        rrd_pipe.stdin.close()  # End of input makes rrdtool exit.
+        rrd_pipe.wait(timeout=2)
+    except (OSError, subprocess.TimeoutExpired):
+        rrd_pipe.kill()
+    rrd_pipe = None
+
+def close_rrd_pipe():
+    """
+    Stop the "rrdtool -" process (used at shutdown).
+    """
+    with rrd_pipe_lock:
+        close_rrd_pipe_locked()
+
+def flush_rrd_updates():
+    """
+    Write all queued samples to the RRD database in a single update.
+    rrdtool accepts many "timestamp:values" strings in one update, so a batch costs one call instead of one per sample.
+    Uses the native rrdtool binding when installed, otherwise the long-running rrdtool pipe - no new process per write either way.
+
+    Returns:
+        None: Failures are logged, never raised - a missed write shouldn't stop the main loop.
+    """
+    if not rrd_pending_updates:
+        return
+    # Take the queued samples and start a fresh queue.
+    batch = rrd_pending_updates[:]
+    rrd_pending_updates.clear()
+    try:
+        if rrdtool is not None:
+            rrdtool.update(*rrd_daemon_args(), RRD_FILE, *batch)
+        else:
+            rrd_pipe_command(['update'] + rrd_daemon_args() + [RRD_FILE] + batch)
+        logging.debug(f"RRD updated with {len(batch)} sample(s).")
+    except Exception as e:
+        logging.error(f"RRD update failed: {e}")
+
+def update_rrd(values):
+    """
+    Queue one sample for the RRD database and write the queue once RRD_BATCH_SIZE samples are waiting.
+    With the default batch size of 1 every sample is written straight away.
+    Non-programmer: Like writing a line in the logbook yourself instead of phoning someone to write it for you.
+
+    Args:
+        values (str): RRD update string, e.g. "timestamp:medtemp:volt1:volt2:...".
+
+    Returns:
+        None
+    """
+    rrd_pending_updates.append(values)
+    if len(rrd_pending_updates) >= RRD_BATCH_SIZE:
+        flush_rrd_updates()
+
+def get_rrd_history(settings):
+    """
+    Return chart history, reusing the last fetch while it is younger than RRD_HISTORY_CACHE_SECONDS.
+    The RRD only gains a new row every 60s, so fetching more often than that just re-reads identical data.
+    Empty results (errors) are not cached, so the next request tries again.
+    Non-programmer: Like checking the notice board once a minute instead of every time someone asks what's on it.
+
+    Args:
+        settings (dict): Passed through to fetch_rrd_history.
+
+    Returns:
+        list: History entries (newest first), same format as fetch_rrd_history.
+    """
+    with rrd_history_lock:
+        now = time.time()
+        if rrd_history_cache['data'] is not None and now - rrd_history_cache['time'] < RRD_HISTORY_CACHE_SECONDS:
+            return rrd_history_cache['data']
+        data = fetch_rrd_history(settings)
+        if data:
+            rrd_history_cache['time'] = now
+            rrd_history_cache['data'] = data
+        return data
+
+# Base battery ASCII art (one bank).
+BATTERY_ART = (
+    " _______________ ",
+    " |             | ",
+    " |             | ",
+    " |             | ",
+    " |             | ",
+    " | +++         | ",
+    " | +++         | ",
+    " |             | ",
+    " |             | ",
+    " |             | ",
+    " |             | ",
+    " | ---         | ",
+    " | ---         | ",
+    " | ---         | ",
+    " |             | ",
+    " |             | ",
+    " |_____________| "
+)
+BATTERY_ART_GAP = " " # Space between neighbouring bank pictures.
+
+@lru_cache(maxsize=256)
+def roman_art(text):
+    """
+    Render text as big 'roman' font ASCII art lines, remembering recent results.
+    The total voltage only changes in the second decimal, so most TUI refreshes reuse an already-built picture.
+
+    Args:
+        text (str): Text to render (e.g., '60.12V').
+
+    Returns:
+        tuple: Art lines, top to bottom.
+    """
+    return tuple(text2art(text, font='roman', chr_ignore=True).splitlines())
+
+@lru_cache(maxsize=None)
+def battery_art_rows(num_banks):
+    """
+    Build the battery art rows with one picture per bank side by side (built once per bank count).
+
+    Args:
+        num_banks (int): Number of series banks.
+
+    Returns:
+        tuple: Full-width art rows, top to bottom.
+    """
+    return tuple(BATTERY_ART_GAP.join([line] * num_banks) for line in BATTERY_ART)
+
+def get_local_ip():
+    """
+    This Pi's network address for the web dashboard URL, cached for LOCAL_IP_CACHE_SECONDS.
+    The address only changes when the network does (e.g., a new DHCP lease), so the TUI doesn't need to ask every refresh.
+
+    Returns:
+        str: IP address, or 'localhost' if it can't be found.
+    """
+    global local_ip_cache
+    now = time.monotonic()
+    if local_ip_cache is not None and now < local_ip_cache[0]:
+        return local_ip_cache[1]
+    local_ip = 'localhost'
+    try:
+        # "Connecting" a UDP socket sends nothing; it just makes the system pick the outgoing interface.
+        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        s.connect(("8.8.8.8", 80))
+        local_ip = s.getsockname()[0]
+        s.close()
+    except Exception:
+        try:
+            local_ip = socket.gethostbyname(socket.gethostname())
+        except OSError:
+            pass
+    local_ip_cache = (now + LOCAL_IP_CACHE_SECONDS, local_ip)
+    return local_ip
+
 def draw_tui(stdscr, voltages, calibrated_temps, raw_temps, offsets, bank_stats, startup_median, alerts, settings, startup_set, is_startup):
     """
     Draw the Terminal User Interface (TUI) using curses.
@@ -1972,196 +2744,129 @@ def draw_tui(stdscr, voltages, calibrated_temps, raw_temps, offsets, bank_stats,
     """
     # Log refresh.
     logging.debug("Refreshing TUI.")
-    # Clear screen.
-    stdscr.clear()
-    # Setup colors.
-    curses.start_color()
-    curses.use_default_colors()
-    curses.init_pair(1, curses.COLOR_RED, -1)
-    curses.init_pair(2, curses.COLOR_RED, -1)
-    curses.init_pair(3, curses.COLOR_YELLOW, -1)
-    curses.init_pair(4, curses.COLOR_GREEN, -1)
-    curses.init_pair(5, curses.COLOR_WHITE, -1)
-    curses.init_pair(6, curses.COLOR_YELLOW, -1)
-    curses.init_pair(7, curses.COLOR_CYAN, -1)
-    curses.init_pair(8, curses.COLOR_MAGENTA, -1)
+    # Blank the drawing buffer. erase() (unlike clear()) lets curses compare the new frame with what's already on
+    # the terminal and send only the characters that changed; a full repaint is only forced when the window size changes.
+    global tui_last_size
+    if stdscr.getmaxyx() != tui_last_size:
+        stdscr.clear()
+        tui_last_size = stdscr.getmaxyx()
+    else:
+        stdscr.erase()
+    # (Color pairs 1-8 are set up once in main().)
+    # Colors and thresholds used for every cell below, looked up once per frame.
+    pair_alert = curses.color_pair(2)  # Red: over the high limit.
+    pair_warn = curses.color_pair(3)  # Yellow: under the low limit.
+    pair_ok = curses.color_pair(4)  # Green: normal.
+    pair_inv = curses.color_pair(8)  # Magenta: no/invalid reading.
+    high_v = settings['HighVoltageThresholdPerBattery']
+    low_v = settings['LowVoltageThresholdPerBattery']
+    high_t = settings['high_threshold']
+    low_t = settings['low_threshold']
+    valid_min = settings['valid_min']
     # Screen size.
     height, width = stdscr.getmaxyx()
     right_half_x = width // 2
+    def put(y, x, text, attr, max_x=right_half_x):
+        """Write text at row y, column x, cut off before column max_x; rows below the screen are skipped."""
+        # Keeping clear of the bottom-right corner means addstr has nothing to complain about; the except is
+        # only a last line of defence (e.g., a resize mid-draw) so the display can never stop the monitoring loop.
+        if y < height and x < max_x - 1:
+            try:
+                stdscr.addstr(y, x, text[:max_x - x - 1], attr)
+            except curses.error:
+                pass
     # Total voltage and color.
     total_v = sum(voltages)
-    total_high = settings['HighVoltageThresholdPerBattery'] * NUM_BANKS
-    total_low = settings['LowVoltageThresholdPerBattery'] * NUM_BANKS
-    v_color = curses.color_pair(2) if total_v > total_high else curses.color_pair(3) if total_v < total_low else curses.color_pair(4)
+    total_high = high_v * NUM_BANKS
+    total_low = low_v * NUM_BANKS
+    v_color = pair_alert if total_v > total_high else pair_warn if total_v < total_low else pair_ok
     # ASCII art for total V.
-    roman_v = text2art(f"{total_v:.2f}V", font='roman', chr_ignore=True)
-    roman_lines = roman_v.splitlines()
+    roman_lines = roman_art(f"{total_v:.2f}V")
     # Draw art lines.
     for i, line in enumerate(roman_lines):
-        if i + 1 < height and len(line) < right_half_x:
-            try:
-                stdscr.addstr(i + 1, 0, line, v_color)
-            except curses.error:
-                logging.warning(f"addstr error for total voltage art line {i+1}.")
-        else:
-            logging.warning(f"Skipping total voltage art line {i+1} - out of bounds.")
+        put(i + 1, 0, line, v_color)
     # Offset for next section.
     y_offset = len(roman_lines) + 3
     if y_offset >= height:
-        logging.warning("TUI y_offset exceeds height; skipping art.")
+        logging.debug("TUI y_offset exceeds height; skipping art.")
         return
-    # Base battery ASCII art (one bank).
-    battery_art_base = [
-        " _______________ ",
-        " |             | ",
-        " |             | ",
-        " |             | ",
-        " |             | ",
-        " | +++         | ",
-        " | +++         | ",
-        " |             | ",
-        " |             | ",
-        " |             | ",
-        " |             | ",
-        " | ---         | ",
-        " | ---         | ",
-        " | ---         | ",
-        " |             | ",
-        " |             | ",
-        " |_____________| "
-    ]
-    art_height = len(battery_art_base)
-    art_width = len(battery_art_base[0])
-    gap = " "
-    gap_len = len(gap)
-    # Draw multiple banks side by side.
-    for row, line in enumerate(battery_art_base):
-        full_line = gap.join([line] * NUM_BANKS)
-        if y_offset + row < height and len(full_line) < right_half_x:
-            try:
-                stdscr.addstr(y_offset + row, 0, full_line, curses.color_pair(4))
-            except curses.error:
-                logging.warning(f"addstr error for art row {row}.")
-        else:
-            logging.warning(f"Skipping art row {row} - out of bounds.")
-    # Overlay voltages on art.
+    # Battery ASCII art, one picture per bank side by side (rows built once per bank count, see battery_art_rows).
+    art_height = len(BATTERY_ART)
+    art_width = len(BATTERY_ART[0])
+    gap_len = len(BATTERY_ART_GAP)
+    art_color = pair_ok
+    # Text to overlay on the art, per art row: one (text, color) per bank - voltage on row 2, bank summary on rows 7-10.
+    overlays = {2: [], 7: [], 8: [], 9: [], 10: []}
     for bank_id in range(NUM_BANKS):
-        start_pos = bank_id * (art_width + gap_len)
-        v_str = f"{voltages[bank_id]:.2f}V" if voltages[bank_id] > 0 else "0.00V"
+        v = voltages[bank_id]
+        v_str = f"{v:.2f}V" if v > 0 else "0.00V"
         # Color based on status.
-        v_color = curses.color_pair(8) if voltages[bank_id] == 0.0 else \
-                 curses.color_pair(2) if voltages[bank_id] > settings['HighVoltageThresholdPerBattery'] else \
-                 curses.color_pair(3) if voltages[bank_id] < settings['LowVoltageThresholdPerBattery'] else \
-                 curses.color_pair(4)
-        v_center = start_pos + (art_width - len(v_str)) // 2
-        v_y = y_offset + 2
-        if v_y < height and v_center + len(v_str) < right_half_x:
-            try:
-                stdscr.addstr(v_y, v_center, v_str, v_color)
-            except curses.error:
-                logging.warning(f"addstr error for voltage overlay Bank {bank_id+1}.")
-        else:
-            logging.warning(f"Skipping voltage overlay for Bank {bank_id+1} - out of bounds.")
+        v_color = pair_inv if v == 0.0 else pair_alert if v > high_v else pair_warn if v < low_v else pair_ok
+        overlays[2].append((v_str, v_color))
         # Bank summary.
         summary = bank_stats[bank_id]
-        med_str = f"Med: {summary['median']:.1f}°C"
-        min_str = f"Min: {summary['min']:.1f}°C"
-        max_str = f"Max: {summary['max']:.1f}°C"
-        inv_str = f"Inv: {summary['invalid']}"
         # Color for summary.
-        s_color = curses.color_pair(2) if summary['median'] > settings['high_threshold'] or summary['median'] < settings['low_threshold'] or summary['invalid'] > 0 else curses.color_pair(4)
-        for idx, s_str in enumerate([med_str, min_str, max_str, inv_str]):
-            s_center = start_pos + (art_width - len(s_str)) // 2
-            s_y = y_offset + 7 + idx
-            if s_y < height and s_center + len(s_str) < right_half_x:
-                try:
-                    stdscr.addstr(s_y, s_center, s_str, s_color)
-                except curses.error:
-                    logging.warning(f"addstr error for summary line {idx+1} Bank {bank_id+1}.")
-            else:
-                logging.warning(f"Skipping summary line {idx+1} for Bank {bank_id+1} - out of bounds.")
+        s_color = pair_alert if summary['median'] > high_t or summary['median'] < low_t or summary['invalid'] > 0 else pair_ok
+        overlays[7].append((f"Med: {summary['median']:.1f}°C", s_color))
+        overlays[8].append((f"Min: {summary['min']:.1f}°C", s_color))
+        overlays[9].append((f"Max: {summary['max']:.1f}°C", s_color))
+        overlays[10].append((f"Inv: {summary['invalid']}", s_color))
+    # Draw multiple banks side by side. A row whose overlay text is all in the art's own color (the normal, no-alarm case)
+    # is merged into the art line and written with a single addstr; otherwise the text is written over the art per bank.
+    for row, full_line in enumerate(battery_art_rows(NUM_BANKS)):
+        cells = overlays.get(row, ())
+        merged = bool(cells) and all(color == art_color for _, color in cells)
+        if merged:
+            line = list(full_line)
+            for bank_id, (text, _) in enumerate(cells):
+                center = bank_id * (art_width + gap_len) + (art_width - len(text)) // 2
+                line[center:center + len(text)] = text
+            full_line = ''.join(line)
+        put(y_offset + row, 0, full_line, art_color)
+        if merged:
+            continue
+        # Overlay per bank.
+        for bank_id, (text, color) in enumerate(cells):
+            put(y_offset + row, bank_id * (art_width + gap_len) + (art_width - len(text)) // 2, text, color)
     # Next offset.
     y_offset += art_height + 2
     # Full temps per bank.
     for bank_id in range(NUM_BANKS):
-        if y_offset < height:
-            try:
-                stdscr.addstr(y_offset, 0, f"Bank {bank_id+1} Temps:", curses.color_pair(7))
-            except curses.error:
-                logging.warning(f"addstr error for bank {bank_id+1} temps header.")
+        put(y_offset, 0, f"Bank {bank_id+1} Temps:", curses.color_pair(7))
         y_offset += 1
         bank_indices = BANK_SENSOR_INDICES[bank_id]
         for i in bank_indices:
-            ch = i + 1
-            bat_id, local_ch = get_battery_and_local_ch(ch)
+            # Battery/local channel straight from the lookup table built in main() (index = 1-based channel).
+            bat_id, local_ch = CHANNEL_TO_BATTERY_LOCAL[i + 1]
             calib = calibrated_temps[i]
             calib_str = f"{calib:.1f}" if calib is not None else "Inv"
             # Extra detail on startup.
             if is_startup:
                 raw = raw_temps[i]
-                raw_str = f"{raw:.1f}" if raw > settings['valid_min'] else "Inv"
-                offset_str = f"{offsets[i]:.1f}" if startup_set and raw > settings['valid_min'] else "N/A"
+                raw_str = f"{raw:.1f}" if raw > valid_min else "Inv"
+                offset_str = f"{offsets[i]:.1f}" if startup_set and raw > valid_min else "N/A"
                 detail = f" ({raw_str}/{offset_str})"
             else:
                 detail = ""
-            t_str = f"Bat {bat_id} Local C{local_ch}: {calib_str}{detail}"
             # Color.
-            t_color = curses.color_pair(8) if "Inv" in calib_str else \
-                     curses.color_pair(2) if calib > settings['high_threshold'] else \
-                     curses.color_pair(3) if calib < settings['low_threshold'] else \
-                     curses.color_pair(4)
-            if y_offset < height and len(t_str) < right_half_x:
-                try:
-                    stdscr.addstr(y_offset, 0, t_str, t_color)
-                except curses.error:
-                    logging.warning(f"addstr error for temp Bank {bank_id+1} Bat {bat_id} Local C{local_ch}.")
-            else:
-                logging.warning(f"Skipping temp for Bank {bank_id+1} Bat {bat_id} Local C{local_ch} - out of bounds.")
+            t_color = pair_inv if calib is None else pair_alert if calib > high_t else pair_warn if calib < low_t else pair_ok
+            put(y_offset, 0, f"Bat {bat_id} Local C{local_ch}: {calib_str}{detail}", t_color)
             y_offset += 1
     # Startup median.
     med_str = f"{startup_median:.1f}°C" if startup_median else "N/A"
-    if y_offset < height:
-        try:
-            stdscr.addstr(y_offset, 0, f"Startup Median Temp: {med_str}", curses.color_pair(7))
-        except curses.error:
-            logging.warning("addstr error for startup median.")
-    else:
-        logging.warning("Skipping startup median - out of bounds.")
+    put(y_offset, 0, f"Startup Median Temp: {med_str}", curses.color_pair(7))
     y_offset += 2
     # Alerts section.
-    if y_offset < height:
-        try:
-            stdscr.addstr(y_offset, 0, "Alerts:", curses.color_pair(7))
-        except curses.error:
-            logging.warning("addstr error for alerts header.")
+    put(y_offset, 0, "Alerts:", curses.color_pair(7))
     y_offset += 1
     if alerts:
         for alert in alerts:
-            if y_offset < height and len(alert) < right_half_x:
-                try:
-                    stdscr.addstr(y_offset, 0, alert, curses.color_pair(8))
-                except curses.error:
-                    logging.warning(f"addstr error for alert '{alert}'.")
-            else:
-                logging.warning(f"Skipping alert '{alert}' - out of bounds.")
+            put(y_offset, 0, alert, pair_inv)
             y_offset += 1
     else:
-        if y_offset < height:
-            try:
-                stdscr.addstr(y_offset, 0, "No alerts.", curses.color_pair(4))
-            except curses.error:
-                logging.warning("addstr error for no alerts message.")
-        else:
-            logging.warning("Skipping no alerts message - out of bounds.")
-    # Get local IP for web URL.
-    local_ip = 'localhost'
-    try:
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
-    except Exception:
-        local_ip = socket.gethostbyname(socket.gethostname())
+        put(y_offset, 0, "No alerts.", pair_ok)
+    # Get local IP for web URL (looked up at most once a minute).
+    local_ip = get_local_ip()
     # Config display in right half.
     y_config = 3
     config_lines = [
@@ -2192,29 +2897,16 @@ def draw_tui(stdscr, voltages, calibrated_temps, raw_temps, offsets, bank_stats,
     for i, line in enumerate(config_lines):
         col = i // 20
         row = i % 20
-        if col < num_cols and y_config + row < height:
-            try:
-                stdscr.addstr(y_config + row, right_half_x + col * col_width, line, curses.color_pair(7))
-            except curses.error:
-                pass
+        if col < num_cols:
+            put(y_config + row, right_half_x + col * col_width, line, curses.color_pair(7), max_x=width)
     # Event history in bottom right.
     y_offset = height // 2
-    if y_offset < height:
-        try:
-            stdscr.addstr(y_offset, right_half_x, "Event History:", curses.color_pair(7))
-        except curses.error:
-            logging.warning("addstr error for event history header.")
+    put(y_offset, right_half_x, "Event History:", curses.color_pair(7), max_x=width)
     y_offset += 1
-    # Last 20 events.
-    for event in event_log[-20:]:
-        if y_offset < height and len(event) < width - right_half_x:
-            try:
-                stdscr.addstr(y_offset, right_half_x, event, curses.color_pair(5))
-            except curses.error:
-                logging.warning(f"addstr error for event '{event}'.")
-            y_offset += 1
-        else:
-            logging.warning(f"Skipping event '{event}' - out of bounds.")
+    # Last 20 events (read straight off the end of the deque, without copying the whole log).
+    for event in islice(event_log, max(0, len(event_log) - 20), None):
+        put(y_offset, right_half_x, event, curses.color_pair(5), max_x=width)
+        y_offset += 1
     # Refresh screen.
     stdscr.refresh()
 
@@ -2258,14 +2950,14 @@ def setup_watchdog(timeout=15):
         if not os.path.exists(WATCHDOG_DEV):
             logging.error(f"Watchdog device {WATCHDOG_DEV} not found. Watchdog disabled.")
             return False
-        # Open device.
-        watchdog_fd = open(WATCHDOG_DEV, 'wb')
+        # Open device (raw file descriptor: each pet is then a single unbuffered write).
+        watchdog_fd = os.open(WATCHDOG_DEV, os.O_WRONLY)
         logging.debug(f"Opened watchdog device: {WATCHDOG_DEV}")
-        # Set timeout via ioctl (magic 'W' + 6, pack timeout).
+        # Set timeout via ioctl. The driver writes back the timeout it actually uses (it may round it).
         try:
-            magic = ord('W') << 8 | 0x06
-            fcntl.ioctl(watchdog_fd, magic, struct.pack("I", timeout))
-            logging.info(f"Watchdog set with timeout {timeout}s")
+            timeout_buf = bytearray(struct.pack("i", timeout))
+            fcntl.ioctl(watchdog_fd, WDIOC_SETTIMEOUT, timeout_buf, True)
+            logging.info(f"Watchdog set with timeout {struct.unpack('i', timeout_buf)[0]}s")
         except IOError as e:
             logging.warning(f"Failed to set watchdog timeout: {e}. Using default.")
         # Log init.
@@ -2278,6 +2970,8 @@ def setup_watchdog(timeout=15):
 def watchdog_pet_thread(pet_interval=5, hang_threshold=12):
     """
     Dedicated thread to pet (reset) the watchdog every pet_interval seconds, but only if main thread is alive.
+    Waits on alive_event instead of a plain sleep, so a finished poll cycle gets the watchdog petted straight away;
+    if main goes quiet, the wait times out after pet_interval and the hang check still runs.
     Checks alive_timestamp; if diff > hang_threshold, assumes hang and stops petting (allows reset).
     Increased hang_threshold to 12s to prevent false hang detection during normal 10s poll_interval sleep, ensuring watchdog (15s timeout) is petted reliably.
     Non-programmer: Like a watchdog dog that you feed treats regularly; if you stop moving (hang), it barks and resets the system.
@@ -2295,25 +2989,25 @@ def watchdog_pet_thread(pet_interval=5, hang_threshold=12):
     while True:
         try:
             # Check if main hung (timestamp stale).
-            if time.time() - alive_timestamp > hang_threshold:
+            if time.monotonic() - alive_timestamp > hang_threshold:
                 logging.warning("Main thread hang detected; stopping watchdog pets to allow reset.")
                 break # Stop petting
             # Pet: Write 'w' to device.
-            if watchdog_fd:
-                watchdog_fd.write(b'w')
-                watchdog_fd.flush()
+            if watchdog_fd is not None:
+                os.write(watchdog_fd, b'w')
                 logging.debug("Watchdog petted")
         except IOError as e:
             # Pet failed—try reopen.
             logging.error(f"Watchdog pet failed: {e}. Reopening device.")
             try:
-                watchdog_fd.close()
-                watchdog_fd = open(WATCHDOG_DEV, 'wb')
+                os.close(watchdog_fd)
+                watchdog_fd = os.open(WATCHDOG_DEV, os.O_WRONLY)
             except IOError as reopen_e:
                 logging.error(f"Failed to reopen watchdog: {reopen_e}. Disabling pets.")
                 break
-        # Wait.
-        time.sleep(pet_interval)
+        # Wait for main's next "alive" signal, or pet_interval at most.
+        alive_event.wait(timeout=pet_interval)
+        alive_event.clear()
 
 def close_watchdog():
     """
@@ -2325,11 +3019,11 @@ def close_watchdog():
     """
     # Global.
     global watchdog_fd
-    if watchdog_fd:
+    if watchdog_fd is not None:
         try:
             # Write 'V' to disable.
-            watchdog_fd.write(b'V')
-            watchdog_fd.close()
+            os.write(watchdog_fd, b'V')
+            os.close(watchdog_fd)
         except IOError:
             pass  # Ignore errors on close.
 
@@ -2427,9 +3121,7 @@ def startup_self_test(settings, stdscr, data_dir):
         except (IOError, AttributeError) as e:
             alert = f"I2C connectivity failure: {str(e)}"
             alerts.append(alert)
-            event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-            if len(event_log) > settings.get('EventLogSize', 20):
-                event_log.pop(0)
+            event_log.append(f"{event_time_str()}: {alert}")
             logging.error(f"I2C connectivity failure: {str(e)}. Bus={settings['I2C_BusNumber']}, "
                           f"Multiplexer=0x{settings['MultiplexerAddress']:02x}, "
                           f"VoltageMeter=0x{settings['VoltageMeterAddress']:02x}")
@@ -2438,14 +3130,14 @@ def startup_self_test(settings, stdscr, data_dir):
                     stdscr.addstr(y + 1, 0, f"I2C failure: {str(e)}", curses.color_pair(2))
                 except curses.error:
                     logging.warning("addstr error for I2C failure.")
-        # Test Modbus per slave.
+        # Test Modbus per slave (all ports probed at once, results shown in slave order).
         y_test = y + 2
+        logging.info(f"Testing Modbus slaves {settings['modbus_slave_addresses']} on ports {settings['modbus_slave_ports']} with num_channels=1")
+        test_results = read_all_slaves(settings, 1, max_retries=1)
         for addr in settings['modbus_slave_addresses']:
-            port_for_slave = get_port_for_slave(addr, settings['modbus_slave_addresses'], settings['modbus_slave_ports'], settings['modbus_port'])
-            logging.info(f"Testing Modbus slave {addr} on port {port_for_slave} (config: {settings['modbus_slave_ports']})")
-            logging.debug(f"Testing Modbus slave {addr} connectivity to {settings['ip']}:{port_for_slave} with num_channels=1")
+            port_for_slave = get_port_for_slave(addr, settings['modbus_slave_port_map'], settings['modbus_port'])
             try:
-                test_query = read_ntc_sensors(settings['ip'], port_for_slave, settings['query_delay'], 1, settings['scaling_factor'], 1, 1, slave_addr=addr)
+                test_query = test_results[addr]
                 if isinstance(test_query, str) and "Error" in test_query:
                     raise ValueError(test_query)
                 logging.debug(f"Modbus test successful for slave {addr}: Received {len(test_query)} values: {test_query}")
@@ -2457,9 +3149,7 @@ def startup_self_test(settings, stdscr, data_dir):
             except Exception as e:
                 alert = f"Modbus Slave {addr} test failure: {str(e)}"
                 alerts.append(alert)
-                event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-                if len(event_log) > settings.get('EventLogSize', 20):
-                    event_log.pop(0)
+                event_log.append(f"{event_time_str()}: {alert}")
                 logging.error(f"Modbus Slave {addr} test failure: {str(e)}. Connection={settings['ip']}:{port_for_slave}, "
                               f"num_channels=1, query_delay={settings['query_delay']}, scaling_factor={settings['scaling_factor']}")
                 if y_test < stdscr.getmaxyx()[0]:
@@ -2479,20 +3169,16 @@ def startup_self_test(settings, stdscr, data_dir):
                 logging.warning("addstr error for step 3.")
         stdscr.refresh()
         time.sleep(0.5)
-        # Temps.
+        # Temps (ports read in parallel, combined in slave order).
         all_initial_temps = []
         temp_fail = False
+        initial_results = read_all_slaves(settings, settings['sensors_per_battery'])
         for addr in settings['modbus_slave_addresses']:
-            port_for_slave = get_port_for_slave(addr, settings['modbus_slave_addresses'], settings['modbus_slave_ports'], settings['modbus_port'])
-            initial_temps = read_ntc_sensors(settings['ip'], port_for_slave, settings['query_delay'],
-                                              settings['sensors_per_battery'], settings['scaling_factor'],
-                                              settings['max_retries'], settings['retry_backoff_base'], slave_addr=addr)
+            initial_temps = initial_results[addr]
             if isinstance(initial_temps, str):
                 alert = f"Initial temp read failure for slave {addr}: {initial_temps}"
                 alerts.append(alert)
-                event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-                if len(event_log) > settings.get('EventLogSize', 20):
-                    event_log.pop(0)
+                event_log.append(f"{event_time_str()}: {alert}")
                 logging.error(f"Initial temperature read failure for slave {addr}: {initial_temps}")
                 all_initial_temps.extend([settings['valid_min']] * settings['sensors_per_battery'])
                 temp_fail = True
@@ -2521,9 +3207,7 @@ def startup_self_test(settings, stdscr, data_dir):
         if any(v == 0.0 for v in initial_voltages):
             alert = "Initial voltage read failure: Zero voltage on one or more banks."
             alerts.append(alert)
-            event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-            if len(event_log) > settings.get('EventLogSize', 20):
-                event_log.pop(0)
+            event_log.append(f"{event_time_str()}: {alert}")
             logging.error(f"Initial voltage read failure: Voltages={initial_voltages}")
             if y + 2 < stdscr.getmaxyx()[0]:
                 try:
@@ -2618,9 +3302,7 @@ def startup_self_test(settings, stdscr, data_dir):
                 if temp_anomaly:
                     alert = f"Skipping balance test from Bank {source} to Bank {dest}: Temp anomalies."
                     alerts.append(alert)
-                    event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-                    if len(event_log) > settings.get('EventLogSize', 20):
-                        event_log.pop(0)
+                    event_log.append(f"{event_time_str()}: {alert}")
                     logging.warning(f"Skipping balance test from Bank {source} to Bank {dest}: Temperature anomalies detected.")
                     if y + 1 < stdscr.getmaxyx()[0]:
                         try:
@@ -2680,9 +3362,7 @@ def startup_self_test(settings, stdscr, data_dir):
                     if source_change >= 0 or dest_change <= 0 or abs(source_change) < min_delta or dest_change < min_delta:
                         alert = f"Balance test from Bank {source} to Bank {dest} failed: Unexpected trend or insufficient change (Bank {source} Initial={initial_source_v:.2f}V, Final={final_source_v:.2f}V, Change={source_change:+.3f}V, Bank {dest} Initial={initial_dest_v:.2f}V, Final={final_dest_v:.2f}V, Change={dest_change:+.3f}V)."
                         alerts.append(alert)
-                        event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-                        if len(event_log) > settings.get('EventLogSize', 20):
-                            event_log.pop(0)
+                        event_log.append(f"{event_time_str()}: {alert}")
                         logging.error(f"Balance test from Bank {source} to Bank {dest} failed: Source did not decrease or destination did not increase sufficiently.")
                         balancer_failed = True
                         if progress_y + 1 < stdscr.getmaxyx()[0]:
@@ -2700,9 +3380,7 @@ def startup_self_test(settings, stdscr, data_dir):
                 else:
                     alert = f"Balance test from Bank {source} to Bank {dest} failed: Insufficient readings."
                     alerts.append(alert)
-                    event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: {alert}")
-                    if len(event_log) > settings.get('EventLogSize', 20):
-                        event_log.pop(0)
+                    event_log.append(f"{event_time_str()}: {alert}")
                     logging.error(f"Balance test from Bank {source} to Bank {dest} failed: Only {len(source_trend)} readings collected.")
                     balancer_failed = True
                     if progress_y + 1 < stdscr.getmaxyx()[0]:
@@ -2720,8 +3398,7 @@ def startup_self_test(settings, stdscr, data_dir):
             startup_failed = True
             logging.error("Startup self-test failures: " + "; ".join(alerts))
             send_alert_email("Startup self-test failures:\n" + "\n".join(alerts), settings)
-            if GPIO:
-                GPIO.output(settings['AlarmRelayPin'], GPIO.HIGH)
+            set_alarm_relay(True, settings)
             stdscr.clear()
             if stdscr.getmaxyx()[0] > 0:
                 try:
@@ -2735,9 +3412,8 @@ def startup_self_test(settings, stdscr, data_dir):
                     logging.warning("addstr error for retry message.")
             stdscr.refresh()
             # Update web.
-            web_data['system_status'] = f'Startup Self-Test Failed - Retry {retries + 1}/{max_retries}'
-            web_data['alerts'] = startup_alerts
-            web_data['last_update'] = time.time()
+            publish_web_data(system_status=f'Startup Self-Test Failed - Retry {retries + 1}/{max_retries}',
+                             alerts=list(startup_alerts), last_update=time.time())
             retries += 1
             if retries >= max_retries:
                 logging.warning("Max retries reached for startup self-test. Proceeding to main loop with startup_failed reset to False.")
@@ -2749,8 +3425,7 @@ def startup_self_test(settings, stdscr, data_dir):
             # Success.
             startup_failed = False
             startup_alerts = []
-            if GPIO:
-                GPIO.output(settings['AlarmRelayPin'], GPIO.LOW)
+            set_alarm_relay(False, settings)
             stdscr.clear()
             if stdscr.getmaxyx()[0] > 0:
                 try:
@@ -2789,6 +3464,11 @@ def start_web_server(settings):
         return
     # Create app.
     app = Flask(__name__)
+    # JSON reply helper: orjson when installed (also handles NumPy values), otherwise Flask's jsonify.
+    def json_response(data):
+        if orjson is not None:
+            return app.response_class(orjson.dumps(data, option=orjson.OPT_SERIALIZE_NUMPY), mimetype='application/json')
+        return jsonify(data)
     # Route for main page.
     @app.route('/')
     def index():
@@ -3011,25 +3691,25 @@ def start_web_server(settings):
     @app.route('/api/status')
     def api_status():
         try:
-            # Lock for thread safety.
-            with data_lock:
-                voltages = [v if v is not None else 0.0 for v in web_data['voltages']]
-                response = {
-                    'voltages': web_data['voltages'],
-                    'temperatures': web_data['temperatures'],
-                    'bank_summaries': web_data['bank_summaries'],
-                    'alerts': web_data['alerts'],
-                    'balancing': web_data['balancing'],
-                    'last_update': web_data['last_update'],
-                    'system_status': web_data['system_status'],
-                    'total_voltage': sum(voltages),
-                    'high_threshold': settings['high_threshold'],
-                    'low_threshold': settings['low_threshold'],
-                    'high_voltage_threshold': settings['HighVoltageThresholdPerBattery'],
-                    'low_voltage_threshold': settings['LowVoltageThresholdPerBattery'],
-                    'sensors_per_battery': settings['sensors_per_battery']
-                }
-            return jsonify(response)
+            # Take the current snapshot once; the main loop swaps in a new one rather than changing it, so no lock is needed.
+            snapshot = web_data
+            voltages = [v if v is not None else 0.0 for v in snapshot['voltages']]
+            response = {
+                'voltages': snapshot['voltages'],
+                'temperatures': snapshot['temperatures'],
+                'bank_summaries': snapshot['bank_summaries'],
+                'alerts': snapshot['alerts'],
+                'balancing': snapshot['balancing'],
+                'last_update': snapshot['last_update'],
+                'system_status': snapshot['system_status'],
+                'total_voltage': sum(voltages),
+                'high_threshold': settings['high_threshold'],
+                'low_threshold': settings['low_threshold'],
+                'high_voltage_threshold': settings['HighVoltageThresholdPerBattery'],
+                'low_voltage_threshold': settings['LowVoltageThresholdPerBattery'],
+                'sensors_per_battery': settings['sensors_per_battery']
+            }
+            return json_response(response)
         except Exception as e:
             logging.error(f"Error in /api/status: {str(e)}\n{traceback.format_exc()}")
             return jsonify({'error': str(e)}), 500
@@ -3037,8 +3717,8 @@ def start_web_server(settings):
     @app.route('/api/history')
     def api_history():
         try:
-            history = fetch_rrd_history(settings)
-            return jsonify({'history': history})
+            history = get_rrd_history(settings)
+            return json_response({'history': history})
         except Exception as e:
             logging.error(f"Error in /api/history: {str(e)}\n{traceback.format_exc()}")
             return jsonify({'error': str(e)}), 500
@@ -3048,9 +3728,10 @@ def start_web_server(settings):
         global balancing_active
         if balancing_active:
             return jsonify({'success': False, 'message': 'Balancing already in progress'}), 400
-        if len(web_data['alerts']) > 0:
+        snapshot = web_data
+        if len(snapshot['alerts']) > 0:
             return jsonify({'success': False, 'message': 'Cannot balance with active alerts'}), 400
-        voltages = web_data['voltages']
+        voltages = snapshot['voltages']
         if len(voltages) < 2:
             return jsonify({'success': False, 'message': 'Not enough battery banks'}), 400
         max_v = max(voltages)
@@ -3076,11 +3757,24 @@ def start_web_server(settings):
                 response.headers['Access-Control-Allow-Methods'] = 'GET, POST, OPTIONS'
                 response.headers['Access-Control-Allow-Headers'] = 'Content-Type, Authorization'
                 return response
+    # Create the WSGI server: waitress if installed (thread pool, keep-alive), otherwise Flask's built-in threaded server.
+    # Kept in web_server so signal_handler can stop it.
+    try:
+        if waitress is not None:
+            web_server = waitress.create_server(app, host=settings['host'], port=settings['web_port'], threads=4)
+        else:
+            web_server = make_server(settings['host'], settings['web_port'], app, threaded=True)
+    except Exception as e:
+        logging.error(f"Web server error: {e}\n{traceback.format_exc()}")
+        return
     # Function to run app.
     def run_app():
-        logging.info("Starting Flask app...")
+        logging.info(f"Starting Flask app ({'waitress' if waitress is not None else 'built-in server'})...")
         try:
-            app.run(host=settings['host'], port=settings['web_port'], threaded=True, debug=False, use_reloader=False)
+            if hasattr(web_server, 'serve_forever'):
+                web_server.serve_forever()
+            else:
+                web_server.run()
         except Exception as e:
             logging.error(f"Web server error: {e}\n{traceback.format_exc()}")
     # Start thread.
@@ -3117,29 +3811,53 @@ def main(stdscr):
     curses.init_pair(8, curses.COLOR_MAGENTA, -1)
     stdscr.nodelay(True)
     # Globals.
-    global previous_temps, previous_bank_medians, run_count, startup_offsets, startup_median, startup_set, battery_voltages, web_data, balancing_active, BANK_SENSOR_INDICES, alive_timestamp, NUM_BANKS, balancer_failed
+    global previous_temps, previous_bank_medians, run_count, startup_offsets, startup_median, startup_set, battery_voltages, web_data, balancing_active, BANK_SENSOR_INDICES, CHANNEL_TO_BANK, CHANNEL_TO_BATTERY_LOCAL, CHANNEL_ALERT_PREFIX, BANK_INDEX_ARRAY, CHANNEL_BANK_ARRAY, alive_timestamp, NUM_BANKS, SENSORS_PER_BATTERY, balancer_failed, RRD_BATCH_SIZE, RRD_DAEMON, modbus_poll_pool, event_log, poll_time_str
     # Load and validate config.
     settings = load_config(data_dir)
     validate_config(settings)
     # Set banks.
     NUM_BANKS = settings['num_series_banks'] # Dynamic now.
+    # Event log size from config (keeps any events logged so far).
+    event_log = deque(event_log, maxlen=max(0, settings['EventLogSize']))
+    # RRD write batching / rrdcached.
+    RRD_BATCH_SIZE = settings['RRDUpdateBatchSize']
+    RRD_DAEMON = settings['RRDCachedAddress']
     number_parallel = settings['number_of_parallel_batteries']
     slave_addresses = settings['modbus_slave_addresses']
     sensors_per_bank = settings['sensors_per_bank']
     sensors_per_battery = NUM_BANKS * sensors_per_bank
+    SENSORS_PER_BATTERY = sensors_per_battery
     total_channels = number_parallel * sensors_per_battery
     # Bank indices.
     BANK_SENSOR_INDICES = [[] for _ in range(settings['num_series_banks'])] # Dynamic list of lists.
     # Init web_data.
-    web_data['voltages'] = [0.0] * NUM_BANKS
-    web_data['temperatures'] = [None] * total_channels
-    web_data['bank_summaries'] = [{'median': 0.0, 'min': 0.0, 'max': 0.0, 'invalid': 0}] * NUM_BANKS
+    publish_web_data(voltages=[0.0] * NUM_BANKS, temperatures=[None] * total_channels,
+                     bank_summaries=[{'median': 0.0, 'min': 0.0, 'max': 0.0, 'invalid': 0}] * NUM_BANKS)
     # Build indices.
     for bat in range(number_parallel):
         base = bat * sensors_per_battery
         for bank_id in range(NUM_BANKS):
             bank_base = base + bank_id * sensors_per_bank
             BANK_SENSOR_INDICES[bank_id].extend(range(bank_base, bank_base + sensors_per_bank))
+    # Freeze the finished layout into tuples - it never changes after startup, and the per-poll loops only iterate it.
+    BANK_SENSOR_INDICES = tuple(tuple(indices) for indices in BANK_SENSOR_INDICES)
+    # Channel -> bank lookup, so get_bank_for_channel is a single list index instead of a search.
+    CHANNEL_TO_BANK = [0] * (total_channels + 1)
+    for bank_id, indices in enumerate(BANK_SENSOR_INDICES, 1):
+        for i in indices:
+            CHANNEL_TO_BANK[i + 1] = bank_id
+    # Channel -> (battery, local channel) lookup, so alert/TUI labels are a single list index.
+    CHANNEL_TO_BATTERY_LOCAL = [None] + [(i // sensors_per_battery + 1, i % sensors_per_battery + 1) for i in range(total_channels)]
+    # Channel -> alert label, so the check functions don't re-format the same 'Battery X Bank Y Local Ch Z' text per alert.
+    CHANNEL_ALERT_PREFIX = [None] + [f"Battery {bat_id} Bank {CHANNEL_TO_BANK[ch]} Local Ch {local_ch}"
+                                     for ch, (bat_id, local_ch) in enumerate(CHANNEL_TO_BATTERY_LOCAL[1:], 1)]
+    # NumPy versions of the same tables for the all-channels-at-once checks.
+    if np is not None:
+        BANK_INDEX_ARRAY = np.array(BANK_SENSOR_INDICES, dtype=np.intp)
+        CHANNEL_BANK_ARRAY = np.array(CHANNEL_TO_BANK[1:], dtype=np.intp) - 1
+    # Modbus poll workers: one per distinct port (slaves on the same port are read in turn by one worker).
+    # Created before the startup checks so the self-test reads the ports in parallel too.
+    modbus_poll_pool = ThreadPoolExecutor(max_workers=max(1, len(set(settings['modbus_slave_ports']))), thread_name_prefix='modbus-poll')
     # Setup.
     setup_hardware(settings)
     time.sleep(1) # Short delay to allow hardware initialization
@@ -3159,27 +3877,34 @@ def main(stdscr):
     # Init previous.
     previous_temps = [None] * total_channels
     previous_bank_medians = [0.0] * NUM_BANKS
-    alive_timestamp = time.time()
+    alive_timestamp = time.monotonic()
+    # Per-poll settings as a read-only record (attribute reads in the hot loop).
+    cfg = LoopConfig.from_settings(settings)
+    # Memory clean-up tuning: tidy once after startup, park the long-lived startup objects so later clean-ups skip them,
+    # then make automatic clean-ups rare - the loop's short-lived numbers/strings are freed immediately anyway.
+    gc.collect()
+    gc.freeze()
+    gc.set_threshold(*GC_THRESHOLDS)
+    last_gc_time = time.monotonic()
     # Main loop.
     while True:
+        # One timestamp for every event logged during this poll.
+        poll_time_str = event_time_str()
         # Temps alerts.
         temps_alerts = [] # List to collect any temperature problems we find
         all_raw_temps = [] # Will hold all raw temperature readings from all sensors
-        # Read temps per slave.
+        # Read temps from all slaves (ports in parallel), then combine in slave order.
+        slave_results = read_all_slaves(settings, sensors_per_battery)
         for addr in slave_addresses:
-            temp_result = read_ntc_sensors(
-                settings['ip'], settings['modbus_port'], settings['query_delay'],
-                sensors_per_battery, settings['scaling_factor'],
-                settings['max_retries'], settings['retry_backoff_base'], slave_addr=addr
-            )
+            temp_result = slave_results[addr]
             if isinstance(temp_result, str):
                 temps_alerts.append(f"Modbus slave {addr} failed: {temp_result}")
-                all_raw_temps.extend([settings['valid_min']] * sensors_per_battery)
+                all_raw_temps.extend([cfg.valid_min] * sensors_per_battery)
             else:
                 all_raw_temps.extend(temp_result)
         raw_temps = all_raw_temps
         # Valid count.
-        valid_count = sum(1 for t in raw_temps if t > settings['valid_min'])
+        valid_count = sum(1 for t in raw_temps if t > cfg.valid_min)
         # Calibrate if first valid full read.
         if not startup_set and valid_count == total_channels:
             startup_median = statistics.median(raw_temps) # Find the middle temperature value
@@ -3191,32 +3916,33 @@ def main(stdscr):
         if startup_set and startup_offsets is None:
             startup_set = False
         # Apply offsets.
-        calibrated_temps = [raw_temps[i] + startup_offsets[i] if startup_set and raw_temps[i] > settings['valid_min'] else raw_temps[i] if raw_temps[i] > settings['valid_min'] else None for i in range(total_channels)]
+        calibrated_temps = [raw_temps[i] + startup_offsets[i] if startup_set and raw_temps[i] > cfg.valid_min else raw_temps[i] if raw_temps[i] > cfg.valid_min else None for i in range(total_channels)]
         # Bank stats.
-        bank_stats = compute_bank_medians(calibrated_temps, settings['valid_min'])
+        bank_stats = compute_bank_medians(calibrated_temps, cfg.valid_min)
         bank_medians = [s['median'] for s in bank_stats]
+        # Pre-screen all channels at once (NumPy) so only channels that can alert are visited; None means check every channel.
+        static_channels, dynamic_channels = flag_temperature_anomalies(
+            calibrated_temps, previous_temps if run_count > 0 else None, bank_medians, previous_bank_medians, cfg)
         # Check static anomalies.
-        for ch, raw in enumerate(raw_temps, 1):
-            if check_invalid_reading(raw, ch, temps_alerts, settings['valid_min'], settings):
+        for i in (range(total_channels) if static_channels is None else static_channels):
+            ch = i + 1
+            if check_invalid_reading(raw_temps[i], ch, temps_alerts, cfg.valid_min):
                 continue
-            calib = calibrated_temps[ch-1]
-            bank_id = get_bank_for_channel(ch)
-            bank_median = bank_medians[bank_id - 1]
-            check_high_temp(calib, ch, temps_alerts, settings['high_threshold'], settings)
-            check_low_temp(calib, ch, temps_alerts, settings['low_threshold'], settings)
-            check_deviation(calib, bank_median, ch, temps_alerts, settings['abs_deviation_threshold'], settings['deviation_threshold'], settings)
+            calib = calibrated_temps[i]
+            bank_median = bank_medians[CHANNEL_TO_BANK[ch] - 1]
+            check_high_temp(calib, ch, temps_alerts, cfg.high_threshold)
+            check_low_temp(calib, ch, temps_alerts, cfg.low_threshold)
+            check_deviation(calib, bank_median, ch, temps_alerts, cfg.abs_deviation_threshold, cfg.deviation_threshold)
         # Dynamic checks if not first run.
         if run_count > 0 and previous_temps and previous_bank_medians is not None:
-            for bank_id in range(1, NUM_BANKS + 1):
-                bank_median_rise = bank_medians[bank_id - 1] - previous_bank_medians[bank_id - 1]
-                bank_indices = BANK_SENSOR_INDICES[bank_id - 1]
-                for i in bank_indices:
-                    ch = i + 1
-                    calib = calibrated_temps[i]
-                    if calib is not None:
-                        check_abnormal_rise(calib, previous_temps, ch, temps_alerts, settings['poll_interval'], settings['rise_threshold'], settings)
-                        check_group_tracking_lag(calib, previous_temps, bank_median_rise, ch, temps_alerts, settings['disconnection_lag_threshold'], settings)
-                    check_sudden_disconnection(calib, previous_temps, ch, temps_alerts, settings)
+            bank_median_rises = [bank_medians[b] - previous_bank_medians[b] for b in range(NUM_BANKS)]
+            for i in (range(total_channels) if dynamic_channels is None else dynamic_channels):
+                ch = i + 1
+                calib = calibrated_temps[i]
+                if calib is not None:
+                    check_abnormal_rise(calib, previous_temps, ch, temps_alerts, cfg.poll_interval, cfg.rise_threshold)
+                    check_group_tracking_lag(calib, previous_temps, bank_median_rises[CHANNEL_TO_BANK[ch] - 1], ch, temps_alerts, cfg.disconnection_lag_threshold)
+                check_sudden_disconnection(calib, previous_temps, ch, temps_alerts)
         # Update previous.
         previous_temps = calibrated_temps[:]
         previous_bank_medians = bank_medians[:]
@@ -3228,30 +3954,28 @@ def main(stdscr):
             logging.warning(f"Error calculating overall median: {e}, using 0.0")
             overall_median = 0.0
         # Fan for cabinet overheat.
-        if overall_median > settings['cabinet_over_temp_threshold']:
+        if overall_median > cfg.cabinet_over_temp_threshold:
             if GPIO:
-                GPIO.output(settings['FanRelayPin'], GPIO.HIGH)
-            logging.info(f"Cabinet over temp: {overall_median:.1f}°C > {settings['cabinet_over_temp_threshold']}°C. Fan activated.")
+                GPIO.output(cfg.fan_relay_pin, GPIO.HIGH)
+            logging.info(f"Cabinet over temp: {overall_median:.1f}°C > {cfg.cabinet_over_temp_threshold}°C. Fan activated.")
             if not any("Cabinet over temp" in a for a in temps_alerts):
-                temps_alerts.append(f"Cabinet over temp: {overall_median:.1f}°C > {settings['cabinet_over_temp_threshold']}°C. Fan on.")
-                event_log.append(f"{time.strftime('%Y-%m-%d %H:%M:%S')}: Cabinet over temp: {overall_median:.1f}°C > {settings['cabinet_over_temp_threshold']}°C. Fan on.")
-                if len(event_log) > settings.get('EventLogSize', 20):
-                    event_log.pop(0)
+                temps_alerts.append(f"Cabinet over temp: {overall_median:.1f}°C > {cfg.cabinet_over_temp_threshold}°C. Fan on.")
+                event_log.append(f"{poll_time_str}: Cabinet over temp: {overall_median:.1f}°C > {cfg.cabinet_over_temp_threshold}°C. Fan on.")
         else:
             if GPIO:
-                GPIO.output(settings['FanRelayPin'], GPIO.LOW)
+                GPIO.output(cfg.fan_relay_pin, GPIO.LOW)
             logging.info("Cabinet temp normal. Fan deactivated.")
         # Read voltages.
         battery_voltages = []
         for i in range(1, NUM_BANKS + 1):
-            v, _, _ = read_voltage_with_retry(i, settings) # Read voltage with error handling
+            v, _, _ = read_voltage_with_retry(i, settings, skip_if_resting=True) # Read voltage with error handling (rested banks skipped)
             battery_voltages.append(v if v is not None else 0.0) # Use 0.0 if reading failed
         # Check issues.
         alert_needed, all_alerts = check_for_issues(battery_voltages, temps_alerts, settings)
         # Update RRD.
         timestamp = int(time.time())
         values = f"{timestamp}:{overall_median}:{':'.join(map(str, battery_voltages))}"
-        subprocess.call(['rrdtool', 'update', RRD_FILE, values])
+        update_rrd(values)
         logging.debug(f"RRD updated with: {values}")
         # Balance decision.
         if len(battery_voltages) == NUM_BANKS and not balancer_failed:
@@ -3262,19 +3986,14 @@ def main(stdscr):
             current_time = time.time()
             any_low_temp = any(t is not None and t < 10 for t in calibrated_temps)
             # Condition.
-            if balancing_active or (not alert_needed and (any_low_temp or max_v - min_v > settings['VoltageDifferenceToBalance']) and min_v > 0 and current_time - last_balance_time > settings['BalanceRestPeriodSeconds']):
+            if balancing_active or (not alert_needed and (any_low_temp or max_v - min_v > cfg.voltage_difference_to_balance) and min_v > 0 and current_time - last_balance_time > cfg.balance_rest_period_seconds):
                 is_heating = any_low_temp
                 balance_battery_voltages(stdscr, high_b, low_b, settings, temps_alerts, is_heating=is_heating) # Transfer charge
                 balancing_active = False
-        # Update web data (locked).
-        with data_lock:
-            web_data['voltages'] = battery_voltages
-            web_data['temperatures'] = calibrated_temps
-            web_data['bank_summaries'] = bank_stats
-            web_data['alerts'] = all_alerts
-            web_data['balancing'] = balancing_active
-            web_data['last_update'] = time.time()
-            web_data['system_status'] = 'Alert' if alert_needed else 'Running'
+        # Publish a new web data snapshot (these lists are rebuilt every cycle, so readers never see them change).
+        publish_web_data(voltages=battery_voltages, temperatures=calibrated_temps, bank_summaries=bank_stats,
+                         alerts=all_alerts, balancing=balancing_active, last_update=time.time(),
+                         system_status='Alert' if alert_needed else 'Running')
         # Draw TUI.
         draw_tui(
             stdscr, battery_voltages, calibrated_temps, raw_temps,
@@ -3282,13 +4001,16 @@ def main(stdscr):
             startup_median, all_alerts, settings, startup_set, is_startup=(run_count == 0)
         )
         # Update alive.
-        alive_timestamp = time.time() # Update aliveness for watchdog thread
+        alive_timestamp = time.monotonic() # Update aliveness for watchdog thread
+        alive_event.set() # Wake the watchdog thread to pet now.
         run_count += 1
-        # Cleanup.
-        gc.collect()
+        # Cleanup: full clean-up only every GC_COLLECT_INTERVAL seconds, not every poll (it can pause for tens of ms on a Pi).
+        if alive_timestamp - last_gc_time >= GC_COLLECT_INTERVAL:
+            gc.collect()
+            last_gc_time = alive_timestamp
         logging.info("Poll cycle complete.")
         # Sleep.
-        time.sleep(settings['poll_interval'])
+        time.sleep(cfg.poll_interval)
       
 if __name__ == '__main__':
     # Arg parser.
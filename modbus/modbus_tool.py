@@ -42,10 +42,8 @@ def modbus_crc(data: bytes) -> bytes:
     for byte in data:
         crc ^= byte
         for _ in range(8):
-            if crc & 0x0001:
-                crc = (crc >> 1) ^ 0xA001
-            else:
-                crc >>= 1
+            # Branchless: -(crc & 1) masks the polynomial in only when the LSB is set
+            crc = (crc >> 1) ^ (0xA001 & -(crc & 1))
     return crc.to_bytes(2, 'little')
 
 